@@ -0,0 +1,20 @@
+# Gunicorn settings for serving main_app:app
+#   gunicorn -c gunicorn_conf.py main_app:app
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}"
+
+# Threads, not processes, carry the concurrency: each /ask request mostly
+# waits on Gemini, and every worker process would build its own RAG system
+# and write to the same vector store, so keep a single worker by default
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+# The first requests can trigger a full pipeline build
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
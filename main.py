@@ -5,6 +5,7 @@ import sys
 from dotenv import load_dotenv
 import json
 import asyncio
+import threading
 
 # Load environment variables
 load_dotenv("./config/.env")
@@ -12,8 +13,11 @@ load_dotenv("./config/.env")
 # Add current directory to Python path
 sys.path.append(os.path.dirname(__file__))
 
+from src.json_provider import ORJSONProvider
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app, origins=['*'])  # Allow all origins for GitHub Pages integration
 
 # Disable Flask auto-reload to prevent venv file watching issues
@@ -21,6 +25,65 @@ app.config['DEBUG'] = False
 app.config['PROPAGATE_EXCEPTIONS'] = True
 
 rag_system = None
+CONFIG_PATH = "./config/config.yaml"
+
+# The RAG system is built on a background thread; requests check the event
+# instead of blocking on the whole pipeline build
+_rag_ready = threading.Event()
+_rag_lock = threading.Lock()
+_rag_thread = None
+
+INITIALIZING_RESPONSE = {
+    'success': False,
+    'status': 'initializing',
+    'message': 'RAG system is still initializing, please retry shortly'
+}
+
+def _build_rag(force_reload=False):
+    global rag_system
+    
+    try:
+        from src.rag_system import initialize_rag_system
+        print("🔧 Initializing Enhanced RAG system with data pipeline...")
+        
+        # This thread owns its event loop, so asyncio.run is safe here
+        rag_system = asyncio.run(initialize_rag_system(CONFIG_PATH, force_reload=force_reload))
+        print("✅ Enhanced RAG system ready!")
+    except Exception as e:
+        print(f"❌ Failed to initialize RAG system: {e}")
+        # A failed refresh keeps serving the system it was meant to replace
+        if rag_system is None:
+            rag_system = "fallback"
+    finally:
+        _rag_ready.set()
+
+def initialize_rag(force_reload=False, reset=False):
+    """Start building the RAG system in the background unless it exists or is being built
+    
+    With force_reload the index is rebuilt even if a system exists; that system
+    keeps answering until the new one replaces it. With reset the current
+    system is dropped first, so requests wait for the new one. Returns False
+    if a build was already running, in which case nothing is changed.
+    """
+    global rag_system, _rag_thread
+    
+    with _rag_lock:
+        if _rag_thread is not None and _rag_thread.is_alive():
+            return False
+        if reset:
+            rag_system = None
+        if rag_system is not None and not force_reload:
+            return True
+        if rag_system is None:
+            _rag_ready.clear()
+        _rag_thread = threading.Thread(target=_build_rag, args=(force_reload,), name="rag-init", daemon=True)
+        _rag_thread.start()
+        return True
+
+# forkserver/spawn PDF workers re-import this script as __mp_main__; only the
+# server process builds the RAG system
+if __name__ != '__mp_main__':
+    initialize_rag()
 
 @app.route('/')
 def index():
@@ -46,23 +109,6 @@ def index():
         }
     })
 
-def initialize_rag():
-    global rag_system
-    
-    if rag_system is None:
-        try:
-            from src.rag_system import initialize_rag_system
-            print("🔧 Initializing Enhanced RAG system with data pipeline...")
-            
-            async def async_init():
-                return await initialize_rag_system()
-            
-            rag_system = asyncio.run(async_init())
-            print("✅ Enhanced RAG system ready!")
-        except Exception as e:
-            print(f"❌ Failed to initialize RAG system: {e}")
-            rag_system = "fallback"
-
 @app.route('/chat', methods=['POST'])
 def chat():
     """Main chat endpoint for frontend integration"""
@@ -80,9 +126,8 @@ def chat():
         
         print(f"📝 Query: {message}")
         
-        # Initialize RAG system if needed
-        if rag_system is None:
-            initialize_rag()
+        if not _rag_ready.is_set():
+            return jsonify(INITIALIZING_RESPONSE), 503
         
         if rag_system != "fallback":
             try:
@@ -142,8 +187,13 @@ def ask_question_legacy():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    if rag_system is None:
-        initialize_rag()
+    # Report 200 while initializing so container health checks pass during startup
+    if not _rag_ready.is_set():
+        return jsonify({
+            'status': 'initializing',
+            'rag_system': 'initializing',
+            'gemini_available': True
+        })
     
     system_info = {
         'status': 'healthy' if rag_system != "fallback" else 'degraded',
@@ -162,8 +212,8 @@ def health_check():
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
-    if rag_system is None:
-        initialize_rag()
+    if not _rag_ready.is_set():
+        return jsonify(INITIALIZING_RESPONSE), 503
     
     if rag_system != "fallback":
         try:
@@ -179,23 +229,16 @@ def get_stats():
 @app.route('/pipeline/refresh', methods=['POST'])
 def refresh_pipeline():
     """Refresh the data pipeline with latest content"""
-    global rag_system
-    
     try:
         print("🔄 Refreshing data pipeline...")
         
-        # Reinitialize with force refresh
-        async def async_refresh():
-            from src.rag_system import initialize_rag_system
-            return await initialize_rag_system(force_reload=True)
-        
-        rag_system = asyncio.run(async_refresh())
+        # Same background build as /reload; a full scrape + re-embed takes minutes
+        started = initialize_rag(force_reload=True)
         
         return jsonify({
-            'status': 'success',
-            'message': 'Data pipeline refreshed successfully',
-            'stats': rag_system.get_stats()
-        })
+            'status': 'accepted',
+            'message': 'Data pipeline refresh started' if started else 'A RAG system build is already running'
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -206,8 +249,8 @@ def refresh_pipeline():
 @app.route('/pipeline/status', methods=['GET'])
 def pipeline_status():
     """Get detailed pipeline status"""
-    if rag_system is None:
-        initialize_rag()
+    if not _rag_ready.is_set():
+        return jsonify(INITIALIZING_RESPONSE), 503
     
     if rag_system != "fallback":
         try:
@@ -232,18 +275,19 @@ def pipeline_status():
 
 @app.route('/reload', methods=['POST'])
 def reload_system():
-    global rag_system
-    
     try:
-        print("🔄 Reloading RAG system...")
-        rag_system = None
-        initialize_rag()
+        # Checked under the build lock, so a running build keeps its system
+        if not initialize_rag(reset=True):
+            return jsonify({
+                'status': 'busy',
+                'message': 'A RAG system build is already in progress'
+            }), 409
         
+        print("🔄 Reloading RAG system...")
         return jsonify({
-            'status': 'success',
-            'message': 'RAG system reloaded',
-            'system': 'langchain' if rag_system != "fallback" else 'fallback'
-        })
+            'status': 'initializing',
+            'message': 'RAG system reload started'
+        }), 202
         
     except Exception as e:
         return jsonify({
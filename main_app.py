@@ -1,24 +1,137 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, render_template
 from flask_cors import CORS
 import os
 import sys
 from dotenv import load_dotenv
 import json
 import asyncio
+import threading
+import atexit
+import logging
+import queue
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 
 load_dotenv("./config/.env")
 
-sys.path.append(os.path.dirname(__file__))
+# Request threads only enqueue log records; a listener thread does the stdout
+# writes. Configured before the src imports so their basicConfig is a no-op.
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
+logger = logging.getLogger("main_app")
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.semantic_cache import ExactCache, SemanticCache
+from src.json_provider import ORJSONProvider
+
+# Import the RAG stack once at startup; without it the API runs in fallback mode
+try:
+    from src.rag_system import initialize_rag_system
+except ImportError as import_error:
+    def initialize_rag_system(*args, _error=import_error, **kwargs):
+        raise _error
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app, origins=['*'])  # Allow all origins for now, restrict in production
 
 rag_system = None
+CONFIG_PATH = "./config/config.yaml"
+# Serializes every build (first request, /reload, refresh), so concurrent
+# first requests do not each load the models and index builds never overlap
+_rag_lock = threading.Lock()
 
-@app.route('/')
-def index():
-    """Simple index page with examples"""
-    return """
+# One long-lived event loop for all pipeline coroutines, so init and refresh
+# do not each bootstrap and tear down a loop on the request thread
+LOOP = asyncio.new_event_loop()
+threading.Thread(target=LOOP.run_forever, name="rag-event-loop", daemon=True).start()
+
+def run_async(coro):
+    """Run a coroutine on the shared loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, LOOP).result()
+
+# Pipeline refreshes run in the background; clients poll their task by id
+refresh_tasks = {}
+_refresh_lock = threading.Lock()
+# Finished tasks stay pollable this long, then are pruned
+REFRESH_TASK_TTL = 3600
+
+def _run_refresh(task_id):
+    """Rebuild the RAG system on a refresh thread and record the outcome on the task"""
+    global rag_system
+    task = refresh_tasks[task_id]
+    
+    try:
+        logger.info(f"🔄 Refreshing data pipeline (task {task_id})...")
+        
+        # The build coroutine runs on LOOP with its blocking steps on worker
+        # threads; this thread only holds the build lock while it waits
+        with _rag_lock:
+            new_system = run_async(initialize_rag_system(CONFIG_PATH, force_reload=True))
+            rag_system = new_system
+            clear_response_caches()
+        
+        task.update(status='completed', finished_at=time.time(), stats=new_system.get_stats())
+        logger.info(f"✅ Data pipeline refresh {task_id} completed")
+    except Exception as e:
+        logger.error(f"❌ Data pipeline refresh {task_id} failed: {e}")
+        task.update(status='failed', finished_at=time.time(), error=str(e))
+
+def _prune_refresh_tasks():
+    """Forget finished refresh tasks older than REFRESH_TASK_TTL"""
+    cutoff = time.time() - REFRESH_TASK_TTL
+    for task_id in [task_id for task_id, task in refresh_tasks.items()
+                    if task.get('finished_at', cutoff) < cutoff]:
+        del refresh_tasks[task_id]
+
+def start_refresh():
+    """Start a refresh in the background, reusing one that is still running"""
+    with _refresh_lock:
+        _prune_refresh_tasks()
+        for task_id, task in refresh_tasks.items():
+            if task['status'] == 'running':
+                return task_id
+        
+        task_id = uuid.uuid4().hex
+        refresh_tasks[task_id] = {'task_id': task_id, 'status': 'running', 'started_at': time.time()}
+        threading.Thread(target=_run_refresh, args=(task_id,), name="rag-refresh", daemon=True).start()
+        return task_id
+
+# Repeated and near-identical questions skip retrieval and the Gemini call
+exact_cache = ExactCache(maxsize=1024)
+semantic_cache = SemanticCache(threshold=0.95)
+
+def clear_response_caches():
+    exact_cache.clear()
+    semantic_cache.clear()
+
+def cached_query(query):
+    """Answer a query through the exact and semantic caches before the RAG chain"""
+    result = exact_cache.get(query)
+    if result is None:
+        query_vector = rag_system.embeddings.embed_query(query)
+        result = semantic_cache.get(query_vector)
+        if result is None:
+            # Run on the shared loop so concurrent requests overlap their Gemini calls;
+            # retrieval reuses query_vector instead of embedding the question again
+            result = run_async(rag_system.aquery(query, query_vector))
+            semantic_cache.put(query_vector, result)
+        exact_cache.put(query, result)
+    return {**result, 'question': query}
+
+# The index page is static: encode it once and let browsers cache it
+_INDEX_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -82,24 +195,34 @@ def index():
         </ul>
     </body>
     </html>
-    """
+    """.encode('utf-8')
+
+@app.route('/')
+def index():
+    """Simple index page with examples"""
+    # A fresh Response per hit; flask-cors adds headers to whatever is returned
+    return Response(_INDEX_HTML, mimetype='text/html', headers={'Cache-Control': 'public, max-age=3600'})
+
+def _build_rag_system():
+    """Build the RAG system on the shared loop, or return the fallback marker"""
+    try:
+        logger.info("🔧 Initializing Enhanced RAG system with data pipeline...")
+        
+        # The blocking parts of the build run on worker threads, not on LOOP
+        system = run_async(initialize_rag_system(CONFIG_PATH))
+        logger.info("✅ Enhanced RAG system ready!")
+        return system
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize RAG system: {e}")
+        return "fallback"
 
 def initialize_rag():
     global rag_system
     
     if rag_system is None:
-        try:
-            from src.rag_system import initialize_rag_system
-            print("🔧 Initializing Enhanced RAG system with data pipeline...")
-            
-            async def async_init():
-                return await initialize_rag_system()
-            
-            rag_system = asyncio.run(async_init())
-            print("✅ Enhanced RAG system ready!")
-        except Exception as e:
-            print(f"❌ Failed to initialize RAG system: {e}")
-            rag_system = "fallback"
+        with _rag_lock:
+            if rag_system is None:
+                rag_system = _build_rag_system()
 
 @app.route('/ask', methods=['POST'])
 def ask_question():
@@ -110,14 +233,14 @@ def ask_question():
         if not query:
             return jsonify({'error': 'No query provided'}), 400
         
-        print(f"📝 Query: {query}")
+        logger.info(f"📝 Query: {query}")
         
         if rag_system is None:
             initialize_rag()
         
         if rag_system != "fallback":
             try:
-                result = rag_system.query(query)
+                result = cached_query(query)
                 
                 response_data = {
                     'query': query,
@@ -132,7 +255,7 @@ def ask_question():
                 return jsonify(response_data)
                 
             except Exception as e:
-                print(f"❌ Enhanced RAG error: {e}")
+                logger.error(f"❌ Enhanced RAG error: {e}")
                 return jsonify({
                     'error': 'RAG system error',
                     'message': str(e)
@@ -144,7 +267,7 @@ def ask_question():
             }), 503
         
     except Exception as e:
-        print(f"❌ Error processing request: {e}")
+        logger.error(f"❌ Error processing request: {e}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 @app.route('/ask/<path:question>', methods=['GET'])
@@ -156,66 +279,17 @@ def ask_question_get(question):
         if not query:
             return jsonify({'error': 'No query provided'}), 400
         
-        print(f"📝 Query (GET): {query}")
+        logger.info(f"📝 Query (GET): {query}")
         
         if rag_system is None:
             initialize_rag()
         
         if rag_system != "fallback":
             try:
-                result = rag_system.query(query)
-                
-                # Format for browser display
-                response_html = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>SAI RAG System Response</title>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
-                        .question {{ background: #e3f2fd; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                        .answer {{ background: #f3e5f5; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                        .sources {{ background: #fff3e0; padding: 15px; border-radius: 5px; }}
-                        .metadata {{ color: #666; font-size: 0.9em; margin-top: 15px; }}
-                        h1, h2 {{ color: #1976d2; }}
-                    </style>
-                </head>
-                <body>
-                    <h1>🏆 SAI Sports Assistant</h1>
-                    
-                    <div class="question">
-                        <h2>❓ Question:</h2>
-                        <p><strong>{result['question']}</strong></p>
-                    </div>
-                    
-                    <div class="answer">
-                        <h2>💬 Answer:</h2>
-                        <p>{result['answer']}</p>
-                    </div>
-                    
-                    <div class="sources">
-                        <h2>📚 Sources ({result['num_sources']} documents):</h2>
-                        <ul>
-                """
-                
-                for i, source in enumerate(result['sources'], 1):
-                    response_html += f"<li><strong>{source['title']}</strong><br><small>From: {source['source']}</small></li>"
+                result = cached_query(query)
                 
-                response_html += """
-                        </ul>
-                    </div>
-                    
-                    <div class="metadata">
-                        <p><strong>System:</strong> Enhanced RAG Pipeline | <strong>Model:</strong> Gemini 1.5 Flash | <strong>Vector Store:</strong> ChromaDB</p>
-                    </div>
-                    
-                    <hr>
-                    <p><a href="/ask/What is the Sports Authority of India">🔗 Try another question</a></p>
-                </body>
-                </html>
-                """
-                
-                return response_html
+                # Compiled once by Jinja and cached; values are autoescaped
+                return render_template('answer.html', result=result)
                 
             except Exception as e:
                 return f"<html><body><h1>❌ Error</h1><p>{str(e)}</p></body></html>", 500
@@ -223,7 +297,7 @@ def ask_question_get(question):
             return "<html><body><h1>❌ RAG System Not Available</h1><p>Please check system configuration</p></body></html>", 503
         
     except Exception as e:
-        print(f"❌ Error processing GET request: {e}")
+        logger.error(f"❌ Error processing GET request: {e}")
         return f"<html><body><h1>❌ Error</h1><p>{str(e)}</p></body></html>", 500
 
 @app.route('/health', methods=['GET'])
@@ -264,24 +338,17 @@ def get_stats():
 
 @app.route('/pipeline/refresh', methods=['POST'])
 def refresh_pipeline():
-    """Refresh the data pipeline with latest content"""
-    global rag_system
-    
+    """Start refreshing the data pipeline with latest content"""
     try:
-        print("🔄 Refreshing data pipeline...")
-        
-        # Reinitialize with force refresh
-        async def async_refresh():
-            from src.rag_system import initialize_rag_system
-            return await initialize_rag_system(force_reload=True)
-        
-        rag_system = asyncio.run(async_refresh())
+        # A full scrape + re-embed takes minutes; answer now and let the client poll
+        task_id = start_refresh()
         
         return jsonify({
-            'status': 'success',
-            'message': 'Data pipeline refreshed successfully',
-            'stats': rag_system.get_stats()
-        })
+            'status': 'accepted',
+            'message': 'Data pipeline refresh started',
+            'task_id': task_id,
+            'status_url': f'/pipeline/refresh/{task_id}'
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -289,6 +356,16 @@ def refresh_pipeline():
             'message': f'Pipeline refresh failed: {str(e)}'
         }), 500
 
+@app.route('/pipeline/refresh/<task_id>', methods=['GET'])
+def refresh_status(task_id):
+    """Get the progress of a pipeline refresh"""
+    task = refresh_tasks.get(task_id)
+    
+    if task is None:
+        return jsonify({'error': 'Unknown refresh task'}), 404
+    
+    return jsonify(task)
+
 @app.route('/pipeline/status', methods=['GET'])
 def pipeline_status():
     """Get detailed pipeline status"""
@@ -321,9 +398,11 @@ def reload_system():
     global rag_system
     
     try:
-        print("🔄 Reloading RAG system...")
-        rag_system = None
-        initialize_rag()
+        logger.info("🔄 Reloading RAG system...")
+        # The current system keeps answering until the new one replaces it
+        with _rag_lock:
+            rag_system = _build_rag_system()
+            clear_response_caches()
         
         return jsonify({
             'status': 'success',
@@ -338,36 +417,36 @@ def reload_system():
         }), 500
 
 if __name__ == '__main__':
-    print("🚀 Starting Enhanced Sports RAG Chatbot API")
-    print("=" * 60)
-    print("🔧 Features:")
-    print("  • Enhanced data pipeline with PDF + Web scraping")
-    print("  • LangChain RAG with advanced retrieval")
-    print("  • Google Gemini AI integration") 
-    print("  • ChromaDB vector storage with persistence")
-    print("  • Intelligent caching and deduplication")
-    print("  • Production-ready Docker deployment")
-    print()
+    logger.info("🚀 Starting Enhanced Sports RAG Chatbot API")
+    logger.info("=" * 60)
+    logger.info("🔧 Features:")
+    logger.info("  • Enhanced data pipeline with PDF + Web scraping")
+    logger.info("  • LangChain RAG with advanced retrieval")
+    logger.info("  • Google Gemini AI integration") 
+    logger.info("  • ChromaDB vector storage with persistence")
+    logger.info("  • Intelligent caching and deduplication")
+    logger.info("  • Production-ready Docker deployment")
     
     api_key = os.getenv("GEMINI_API_KEY")
     if api_key and api_key != "your_gemini_api_key_here":
-        print("✅ Gemini API key configured")
+        logger.info("✅ Gemini API key configured")
     else:
-        print("⚠️  Gemini API key not configured - set GEMINI_API_KEY environment variable")
+        logger.warning("⚠️  Gemini API key not configured - set GEMINI_API_KEY environment variable")
     
     # Get port from environment (Render sets this automatically)
     port = int(os.getenv("PORT", 5000))
     host = os.getenv("HOST", "0.0.0.0")
     debug_mode = os.getenv("DEBUG", "False").lower() == "true"
     
-    print(f"🌐 Server starting on {host}:{port}")
-    print("\n🔗 Endpoints:")
-    print("  GET  / - Homepage with examples")
-    print("  GET  /ask/<question> - Ask questions via URL")
-    print("  POST /ask - Ask sports questions with enhanced RAG")
-    print("  GET  /health - System health and status")
-    print("  GET  /stats - Detailed system statistics")
-    print("  POST /pipeline/refresh - Refresh data pipeline")
-    print("  GET  /pipeline/status - Pipeline status and metrics")
+    logger.info(f"🌐 Server starting on {host}:{port}")
+    logger.info("🔗 Endpoints:")
+    logger.info("  GET  / - Homepage with examples")
+    logger.info("  GET  /ask/<question> - Ask questions via URL")
+    logger.info("  POST /ask - Ask sports questions with enhanced RAG")
+    logger.info("  GET  /health - System health and status")
+    logger.info("  GET  /stats - Detailed system statistics")
+    logger.info("  POST /pipeline/refresh - Refresh data pipeline")
+    logger.info("  GET  /pipeline/refresh/<task_id> - Refresh progress")
+    logger.info("  GET  /pipeline/status - Pipeline status and metrics")
     
     app.run(debug=debug_mode, host=host, port=port)
\ No newline at end of file
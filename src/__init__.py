@@ -6,6 +6,9 @@ This package contains the core components of the SAI RAG chatbot system:
 - data_pipeline.py: Data processing and ingestion pipeline
 - pdf_processor.py: PDF document processing
 - web_scraper.py: Web content scraping from SAI websites
+- onnx_embeddings.py: INT8 ONNX Runtime embeddings backend
+- semantic_cache.py: Exact and embedding-similarity response caches
+- json_provider.py: orjson-backed JSON provider for the Flask apps
 - config_manager.py: Configuration management
 """
 
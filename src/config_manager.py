@@ -1,10 +1,13 @@
-import os
-import json
+import threading
+import orjson
 import yaml
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
+# libyaml's C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 @dataclass
 class PipelineConfig:
     pdf_data_path: str = "./data"
@@ -14,6 +17,7 @@ class PipelineConfig:
     
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    min_chunk_size: int = 400  # smaller split chunks are merged into a neighbour
     embedding_model: str = "all-MiniLM-L6-v2"
     llm_model: str = "gemini-1.5-flash"
     llm_temperature: float = 0.3
@@ -29,17 +33,31 @@ class PipelineConfig:
     enable_caching: bool = True
     enable_content_filtering: bool = True
     
+    max_pdf_workers: int = 8
+    enable_pdfplumber_fallback: bool = False
+    ocr_max_pages: int = 5
+    
+    chroma_batch_size: int = 250
+    embedding_backend: str = "torch"  # "torch" or "onnx" (INT8 ONNX Runtime)
+    embedding_batch_size: int = 128
+    vector_store_backend: str = "chroma"  # "chroma" or "faiss"
+    embedding_concurrency: int = 1  # Batches in flight at once; only the ONNX backend overlaps them
+    
+    # Retrieve on chunk_size children but hand their parent_chunk_size parents to the LLM
+    enable_parent_child_chunking: bool = False
+    parent_chunk_size: int = 4000
+    
     @classmethod
     def from_file(cls, config_path: str) -> 'PipelineConfig':
         config_path = Path(config_path)
         if not config_path.exists():
             return cls()
         
-        with open(config_path, 'r') as f:
-            if config_path.suffix.lower() == '.yaml' or config_path.suffix.lower() == '.yml':
-                data = yaml.safe_load(f)
-            else:
-                data = json.load(f)
+        if config_path.suffix.lower() == '.yaml' or config_path.suffix.lower() == '.yml':
+            with open(config_path, 'r') as f:
+                data = yaml.load(f, Loader=_YAML_LOADER)
+        else:
+            data = orjson.loads(config_path.read_bytes())
         
         return cls(**data)
     
@@ -54,6 +72,7 @@ class PipelineConfig:
             'cache_path': self.cache_path,
             'chunk_size': self.chunk_size,
             'chunk_overlap': self.chunk_overlap,
+            'min_chunk_size': self.min_chunk_size,
             'embedding_model': self.embedding_model,
             'llm_model': self.llm_model,
             'llm_temperature': self.llm_temperature,
@@ -65,19 +84,46 @@ class PipelineConfig:
             'enable_pdf_processing': self.enable_pdf_processing,
             'enable_web_scraping': self.enable_web_scraping,
             'enable_caching': self.enable_caching,
-            'enable_content_filtering': self.enable_content_filtering
+            'enable_content_filtering': self.enable_content_filtering,
+            'max_pdf_workers': self.max_pdf_workers,
+            'enable_pdfplumber_fallback': self.enable_pdfplumber_fallback,
+            'ocr_max_pages': self.ocr_max_pages,
+            'chroma_batch_size': self.chroma_batch_size,
+            'embedding_backend': self.embedding_backend,
+            'embedding_batch_size': self.embedding_batch_size,
+            'vector_store_backend': self.vector_store_backend,
+            'embedding_concurrency': self.embedding_concurrency,
+            'enable_parent_child_chunking': self.enable_parent_child_chunking,
+            'parent_chunk_size': self.parent_chunk_size
         }
         
-        with open(config_path, 'w') as f:
-            if config_path.suffix.lower() == '.yaml' or config_path.suffix.lower() == '.yml':
+        if config_path.suffix.lower() == '.yaml' or config_path.suffix.lower() == '.yml':
+            with open(config_path, 'w') as f:
                 yaml.dump(data, f, default_flow_style=False)
-            else:
-                json.dump(data, f, indent=2)
+        else:
+            config_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+# Bursts of update_config calls are written to disk once, after this quiet period
+SAVE_DEBOUNCE_SECONDS = 0.5
 
 class ConfigManager:
     def __init__(self, config_path: str = "./config/config.yaml"):
         self.config_path = config_path
         self.config = PipelineConfig.from_file(config_path)
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+    
+    def __getstate__(self):
+        # Worker processes receive a copy; the lock and pending timer stay here
+        state = self.__dict__.copy()
+        state['_save_timer'] = None
+        del state['_save_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._save_lock = threading.Lock()
     
     def get_config(self) -> PipelineConfig:
         return self.config
@@ -86,10 +132,29 @@ class ConfigManager:
         for key, value in kwargs.items():
             if hasattr(self.config, key):
                 setattr(self.config, key, value)
-        self.save_config()
+        
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self._save_if_dirty)
+            self._save_timer.start()
+    
+    def _save_if_dirty(self):
+        with self._save_lock:
+            if self._dirty:
+                self.config.save(self.config_path)
+                self._dirty = False
+            self._save_timer = None
     
     def save_config(self):
-        self.config.save(self.config_path)
+        """Write the configuration now, flushing any pending debounced save"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self.config.save(self.config_path)
+            self._dirty = False
     
     def validate_config(self) -> List[str]:
         errors = []
@@ -1,22 +1,133 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+import os
+from typing import List, Dict, Any, Optional, AsyncIterator, Set
 from pathlib import Path
 import logging
+import re
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
+import orjson
+import xxhash
+
 from .config_manager import ConfigManager
-from .pdf_processor import EnhancedPDFProcessor, create_knowledge_base_from_pdfs
+from .pdf_processor import EnhancedPDFProcessor, PDF_AVAILABLE
 from .web_scraper import WebScraper
 
+# Any run of whitespace and/or characters outside the allowed punctuation
+# collapses to a single space, in one pass
+_RE_NOISE_RUN = re.compile(r'(?:[^\w\s.,!?;:\-()]|\s)+')
+
+# ASCII fast path for the same rule: map disallowed characters to spaces in
+# C via str.translate, then let str.split collapse the whitespace
+_ASCII_NOISE_TABLE = {
+    code: ' ' for code in range(128)
+    if not (chr(code).isalnum() or chr(code).isspace() or chr(code) in '_.,!?;:-()')
+}
+
+_CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    "document_id TEXT, category TEXT, data_source TEXT, payload BLOB)"
+)
+
+async def _abatched(items: AsyncIterator[Dict[str, Any]], size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Group an async stream into lists of up to size items"""
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class DocumentStore:
+    """SQLite-backed store for processed documents, so full texts live on disk
+    between pipeline runs instead of on the Python heap"""
+    
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, isolation_level=None, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_CREATE_TABLE_SQL.format(table="documents"))
+        self._create_indexes()
+    
+    def begin_replace(self):
+        """Start staging a new pipeline run next to the stored one"""
+        with self._lock:
+            self._db.execute("DROP TABLE IF EXISTS documents_staging")
+            self._db.execute(_CREATE_TABLE_SQL.format(table="documents_staging"))
+    
+    def stage(self, documents: List[Dict[str, Any]]):
+        """Append a batch of the run being staged, in one transaction"""
+        rows = [(doc.get('document_id'), doc.get('category'), doc.get('data_source'), orjson.dumps(doc))
+                for doc in documents]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT INTO documents_staging VALUES (?, ?, ?, ?)", rows)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+    
+    def commit_replace(self):
+        """Swap the staged run in for the stored documents in one transaction"""
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute("DROP TABLE documents")
+                self._db.execute("ALTER TABLE documents_staging RENAME TO documents")
+                self._create_indexes()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+    
+    def _create_indexes(self):
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_documents_category ON documents(category)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_documents_source ON documents(data_source)")
+    
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def category_counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT category, COUNT(*) FROM documents GROUP BY category").fetchall()
+        return {category or 'unknown': count for category, count in rows}
+    
+    def find(self, column: str, value: str) -> List[Dict[str, Any]]:
+        """Fetch documents whose indexed column (category or data_source) equals value"""
+        if column not in ('category', 'data_source'):
+            raise ValueError(f"Unsupported filter column: {column}")
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT payload FROM documents WHERE {column} = ? ORDER BY rowid", (value,)
+            ).fetchall()
+        return [orjson.loads(payload) for (payload,) in rows]
+
 class DataPipeline:
     def __init__(self, config_manager: ConfigManager):
+        self.config_manager = config_manager
         self.config = config_manager.get_config()
         self.logger = logging.getLogger(__name__)
         
         self.pdf_processor = EnhancedPDFProcessor(config_manager)
         self.web_scraper = None
         
-        self.processed_documents = []
+        # PDF worker processes outlive a single run, so refreshes skip the
+        # process start-up and keep each worker's in-memory extraction cache
+        self._pdf_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Processed documents are kept on disk; only the latest run is stored
+        self.document_store = DocumentStore(Path(self.config.cache_path) / "documents.db")
         self.pipeline_stats = {
             'pdf_documents': 0,
             'web_documents': 0,
@@ -27,100 +138,161 @@ class DataPipeline:
     
     async def run_full_pipeline(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """Run the complete data processing pipeline"""
+        all_documents = []
+        async for batch in self.iter_document_batches(force_refresh):
+            all_documents.extend(batch)
+        return all_documents
+    
+    async def iter_document_batches(self, force_refresh: bool = False,
+                                    batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Run the complete pipeline, yielding cleaned, deduplicated documents in batches
+        
+        Sources are only drained as batches are taken, so a slow consumer such as
+        the embedder holds back PDF parsing instead of letting the corpus pile up
+        in memory. The run replaces the stored documents once the last batch is taken.
+        """
+        batch_size = batch_size or self.config.chroma_batch_size
         start_time = datetime.now()
         self.logger.info("🚀 Starting full data pipeline...")
         
-        all_documents = []
+        seen_hashes: Set[int] = set()
+        total_produced = total_admitted = total_documents = 0
+        
+        # Scraping is I/O-bound, so it runs in the background while PDF chunks
+        # stream in; its documents are admitted after the PDFs, so which copy of
+        # a duplicate survives does not depend on which source finishes first
+        web_documents = None
+        if self.config.enable_web_scraping:
+            self.logger.info("🌐 Processing web content...")
+            web_documents = asyncio.create_task(self._collect_web_documents(force_refresh))
+        
+        async def iter_web():
+            for doc in await web_documents:
+                yield doc
         
-        # Process PDFs
+        sources = []
         if self.config.enable_pdf_processing:
             self.logger.info("📄 Processing PDF documents...")
-            pdf_documents = await self._process_pdfs(force_refresh)
-            all_documents.extend(pdf_documents)
-            self.pipeline_stats['pdf_documents'] = len(pdf_documents)
-            self.logger.info(f"✅ Processed {len(pdf_documents)} PDF documents")
+            sources.append(('pdf', 'PDF', self._iter_pdf_documents(force_refresh)))
+        if web_documents is not None:
+            sources.append(('web', 'web', iter_web()))
         
-        # Process web content
-        if self.config.enable_web_scraping:
-            self.logger.info("🌐 Processing web content...")
-            web_documents = await self._process_web_content(force_refresh)
-            all_documents.extend(web_documents)
-            self.pipeline_stats['web_documents'] = len(web_documents)
-            self.logger.info(f"✅ Processed {len(web_documents)} web documents")
+        async def iter_admitted():
+            nonlocal total_produced
+            for source, label, documents in sources:
+                produced = 0
+                async for doc in documents:
+                    produced += 1
+                    # Duplicates are dropped as they arrive, so they never reach a batch
+                    if self._admit_document(doc, seen_hashes):
+                        yield doc
+                total_produced += produced
+                self.pipeline_stats[f'{source}_documents'] = produced
+                self.logger.info(f"✅ Processed {produced} {label} documents")
         
-        # Deduplicate and clean
-        all_documents = self._deduplicate_documents(all_documents)
-        all_documents = self._clean_and_validate_documents(all_documents)
+        self.document_store.begin_replace()
+        try:
+            async for batch in _abatched(iter_admitted(), batch_size):
+                total_admitted += len(batch)
+                batch = self._clean_and_validate_documents(batch)
+                if batch:
+                    total_documents += len(batch)
+                    self.document_store.stage(batch)
+                    yield batch
+        finally:
+            if web_documents is not None:
+                web_documents.cancel()
+        
+        removed_count = total_produced - total_admitted
+        if removed_count > 0:
+            self.logger.info(f"🔄 Removed {removed_count} duplicate documents")
         
         # Update stats
-        self.pipeline_stats['total_documents'] = len(all_documents)
+        self.pipeline_stats['total_documents'] = total_documents
         self.pipeline_stats['processing_time'] = (datetime.now() - start_time).total_seconds()
         self.pipeline_stats['last_run'] = datetime.now().isoformat()
         
-        self.processed_documents = all_documents
+        self.document_store.commit_replace()
         
-        self.logger.info(f"🎉 Pipeline completed! Total documents: {len(all_documents)}")
+        self.logger.info(f"🎉 Pipeline completed! Total documents: {total_documents}")
         self._log_pipeline_summary()
-        
-        return all_documents
     
-    async def _process_pdfs(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
-        """Process PDF documents"""
+    def _get_pdf_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Create the persistent PDF worker pool on first use"""
+        if self._pdf_pool is None and min(os.cpu_count() or 1, self.config.max_pdf_workers) > 1:
+            self._pdf_pool = self.pdf_processor.create_worker_pool()
+            weakref.finalize(self, self._pdf_pool.shutdown, wait=False)
+        return self._pdf_pool
+    
+    def _tag_document(self, doc: Dict[str, Any], data_source: str) -> Dict[str, Any]:
+        """Add pipeline metadata"""
+        doc['processed_by'] = 'data_pipeline'
+        doc['processed_at'] = datetime.now().isoformat()
+        doc['data_source'] = data_source
+        return doc
+    
+    async def _iter_pdf_documents(self, force_refresh: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Stream PDF chunks from a worker thread as each PDF finishes"""
+        if not PDF_AVAILABLE:
+            self.logger.error("PDF processing libraries not available. Please install: pip install PyPDF2 pdfplumber")
+            return
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        done = object()
+        stopped = threading.Event()
+        
+        def produce():
+            try:
+                for doc in self.pdf_processor.iter_all_chunks(self._get_pdf_pool()):
+                    if stopped.is_set():
+                        break
+                    asyncio.run_coroutine_threadsafe(queue.put(doc), loop).result()
+            except BrokenProcessPool:
+                # A crashed worker poisons the pool; start a fresh one next run
+                self._pdf_pool = None
+                raise
+            finally:
+                # Not waited on, so the thread never blocks on a consumer that is gone
+                if not stopped.is_set():
+                    asyncio.run_coroutine_threadsafe(queue.put(done), loop)
+        
+        # Parse in a worker thread so the event loop keeps serving the scraper
+        producer = loop.run_in_executor(None, produce)
         try:
-            # Use the existing function but wrap it for async compatibility
-            pdf_documents = create_knowledge_base_from_pdfs(self.config.pdf_data_path)
-            
-            # Add pipeline metadata
-            for doc in pdf_documents:
-                doc['processed_by'] = 'data_pipeline'
-                doc['processed_at'] = datetime.now().isoformat()
-                doc['data_source'] = 'pdf'
-            
-            return pdf_documents
-            
+            while (doc := await queue.get()) is not done:
+                yield self._tag_document(doc, 'pdf')
+            await producer
         except Exception as e:
             self.logger.error(f"Error processing PDFs: {e}")
-            return []
+        finally:
+            # After an early exit the producer may be waiting on a full queue;
+            # tell it to stop and make room for its last put
+            stopped.set()
+            while not queue.empty():
+                queue.get_nowait()
     
-    async def _process_web_content(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
-        """Process web content from URLs"""
+    async def _collect_web_documents(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Scrape the configured URLs into tagged documents"""
         try:
-            async with WebScraper(ConfigManager()) as scraper:
+            async with WebScraper(self.config_manager) as scraper:
                 scraped_content = await scraper.scrape_urls_from_file(self.config.url_file_path)
                 web_documents = scraper.convert_to_documents(scraped_content)
-                
-                # Add pipeline metadata
-                for doc in web_documents:
-                    doc['processed_by'] = 'data_pipeline'
-                    doc['processed_at'] = datetime.now().isoformat()
-                    doc['data_source'] = 'web'
-                
-                return web_documents
-                
         except Exception as e:
             self.logger.error(f"Error processing web content: {e}")
             return []
-    
-    def _deduplicate_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate documents based on content similarity"""
-        seen_hashes = set()
-        unique_documents = []
-        
-        for doc in documents:
-            # Create a simple hash based on content
-            content_hash = hash(doc['text'][:500])  # Use first 500 chars for hash
-            
-            if content_hash not in seen_hashes:
-                seen_hashes.add(content_hash)
-                unique_documents.append(doc)
-            else:
-                self.logger.debug(f"Duplicate document skipped: {doc.get('title', 'Unknown')}")
-        
-        removed_count = len(documents) - len(unique_documents)
-        if removed_count > 0:
-            self.logger.info(f"🔄 Removed {removed_count} duplicate documents")
         
-        return unique_documents
+        return [self._tag_document(doc, 'web') for doc in web_documents]
+    
+    def _admit_document(self, doc: Dict[str, Any], seen_hashes: Set[int]) -> bool:
+        """Return True the first time a document's content is seen"""
+        # Hash the full text; stable across processes, unlike hash()
+        content_hash = xxhash.xxh3_64_intdigest(doc['text'].encode('utf-8'))
+        if content_hash in seen_hashes:
+            self.logger.debug(f"Duplicate document skipped: {doc.get('title', 'Unknown')}")
+            return False
+        seen_hashes.add(content_hash)
+        return True
     
     def _clean_and_validate_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Clean and validate document content"""
@@ -140,35 +312,26 @@ class DataPipeline:
             doc.setdefault('source', 'Unknown Source')
             doc.setdefault('category', 'general')
             
-            # Add document ID
-            doc['document_id'] = self._generate_document_id(doc)
-            
             valid_documents.append(doc)
         
+        # Add document IDs
+        self._assign_ids(valid_documents)
+        
         return valid_documents
     
     def _clean_text_content(self, text: str) -> str:
         """Clean and normalize text content"""
-        import re
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        
-        # Remove special characters that might cause issues
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', ' ', text)
-        
-        # Fix spacing issues
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        # Replace special characters that might cause issues and collapse whitespace
+        if text.isascii():
+            return ' '.join(text.translate(_ASCII_NOISE_TABLE).split())
+        return _RE_NOISE_RUN.sub(' ', text).strip()
     
-    def _generate_document_id(self, doc: Dict[str, Any]) -> str:
-        """Generate unique document ID"""
-        import hashlib
-        
-        id_string = f"{doc['title']}_{doc['source']}_{doc.get('chunk_id', 0)}"
-        return hashlib.md5(id_string.encode()).hexdigest()[:12]
+    def _assign_ids(self, documents: List[Dict[str, Any]]):
+        """Assign a stable document ID to every document in one batch"""
+        keys = [f"{doc['title']}_{doc['source']}_{doc.get('chunk_id', 0)}".encode() for doc in documents]
+        ids = [xxhash.xxh3_64_hexdigest(key)[:12] for key in keys]
+        for doc, document_id in zip(documents, ids):
+            doc['document_id'] = document_id
     
     def _log_pipeline_summary(self):
         """Log summary of pipeline execution"""
@@ -179,13 +342,8 @@ class DataPipeline:
         self.logger.info(f"  Processing Time: {self.pipeline_stats['processing_time']:.2f}s")
         
         # Log category breakdown
-        categories = {}
-        for doc in self.processed_documents:
-            cat = doc.get('category', 'unknown')
-            categories[cat] = categories.get(cat, 0) + 1
-        
         self.logger.info("  Document Categories:")
-        for category, count in sorted(categories.items()):
+        for category, count in sorted(self.document_store.category_counts().items()):
             self.logger.info(f"    {category}: {count}")
     
     def get_pipeline_stats(self) -> Dict[str, Any]:
@@ -194,11 +352,11 @@ class DataPipeline:
     
     def get_documents_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Get documents filtered by category"""
-        return [doc for doc in self.processed_documents if doc.get('category') == category]
+        return self.document_store.find('category', category)
     
     def get_documents_by_source(self, source_type: str) -> List[Dict[str, Any]]:
         """Get documents filtered by source type (pdf/web)"""
-        return [doc for doc in self.processed_documents if doc.get('data_source') == source_type]
+        return self.document_store.find('data_source', source_type)
     
     async def incremental_update(self) -> List[Dict[str, Any]]:
         """Run incremental update for new/changed content"""
@@ -240,6 +398,15 @@ class PipelineManager:
         
         return await self.pipeline.run_full_pipeline(force_refresh)
     
+    async def iter_pipeline_batches(self, force_refresh: bool = False,
+                                    batch_size: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Run the complete data pipeline, yielding document batches as they are ready"""
+        if not await self.initialize_pipeline():
+            return
+        
+        async for batch in self.pipeline.iter_document_batches(force_refresh, batch_size):
+            yield batch
+    
     def get_pipeline_status(self) -> Dict[str, Any]:
         """Get current pipeline status"""
         return {
@@ -249,7 +416,7 @@ class PipelineManager:
                 'caching_enabled': self.config_manager.get_config().enable_caching
             },
             'stats': self.pipeline.get_pipeline_stats(),
-            'document_count': len(self.pipeline.processed_documents)
+            'document_count': self.pipeline.document_store.count()
         }
 
 async def main():
@@ -0,0 +1,20 @@
+"""
+Flask JSON provider backed by orjson, shared by the API apps.
+"""
+
+from typing import Any
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize responses with orjson; keeps Flask's key sorting and fallback types"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
@@ -0,0 +1,92 @@
+"""
+Sentence-transformer embeddings served by ONNX Runtime.
+
+The model is exported to ONNX once, graph-optimized and dynamically
+quantized to INT8, then cached on disk, so later starts only load the
+quantized graph. Pooling matches the sentence-transformers models used by
+HuggingFaceEmbeddings (mean over tokens, then L2 normalization).
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+QUANTIZED_MODEL_FILE = "model_optimized_quantized.onnx"
+
+class ONNXEmbeddings(Embeddings):
+    """LangChain embeddings backed by an INT8-quantized ONNX export of a HF model"""
+
+    def __init__(self, model_name: str, cache_dir: str = "./cache/onnx", batch_size: int = 64):
+        if not ONNX_AVAILABLE:
+            raise ImportError("ONNX embeddings need optimum[onnxruntime] installed")
+
+        # Short sentence-transformers names resolve on the hub under their org
+        self.model_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        self.batch_size = batch_size
+        self.model_dir = Path(cache_dir) / self.model_name.replace("/", "__")
+        # Fast tokenizers raise "Already borrowed" when shared across threads;
+        # session.run is thread-safe, so only tokenization is serialized
+        self._tokenizer_lock = threading.Lock()
+
+        if not (self.model_dir / QUANTIZED_MODEL_FILE).exists():
+            self._export()
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(self.model_dir, file_name=QUANTIZED_MODEL_FILE)
+
+    def _export(self):
+        """Export to ONNX, apply O2 graph optimizations and dynamic INT8 quantization"""
+        logger.info(f"📦 Exporting {self.model_name} to quantized ONNX in {self.model_dir}")
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+
+        model = ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True)
+        AutoTokenizer.from_pretrained(self.model_name).save_pretrained(self.model_dir)
+
+        ORTOptimizer.from_pretrained(model).optimize(
+            save_dir=self.model_dir,
+            optimization_config=OptimizationConfig(optimization_level=2)
+        )
+
+        quantizer = ORTQuantizer.from_pretrained(self.model_dir, file_name="model_optimized.onnx")
+        quantizer.quantize(
+            save_dir=self.model_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        with self._tokenizer_lock:
+            inputs = self.tokenizer(texts, padding=True, truncation=True, return_tensors="np")
+        hidden = self.model(**inputs).last_hidden_state
+
+        mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Length-sorted batches keep padding to each batch's own longest text
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
@@ -1,128 +1,335 @@
 import os
 import sys
 import re
-import hashlib
-import json
-from typing import List, Dict, Any, Optional
+import sqlite3
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from pathlib import Path
 from datetime import datetime
 import logging
+import multiprocessing
+import weakref
+from logging.handlers import QueueHandler
+from importlib.util import find_spec
+from itertools import repeat
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import orjson
+import xxhash
 
 from .config_manager import ConfigManager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-try:
-    import PyPDF2
-    PDF_AVAILABLE = True
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
-
-try:
-    import pdfplumber
-    PDF_AVAILABLE = True
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
+# Fallback extractors are only imported when they are actually used
+PYPDF2_AVAILABLE = find_spec("PyPDF2") is not None
+PDFPLUMBER_AVAILABLE = find_spec("pdfplumber") is not None
 
 try:
     import fitz  # PyMuPDF
     PYMUPDF_AVAILABLE = True
-    PDF_AVAILABLE = True
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
+PDF_AVAILABLE = PYPDF2_AVAILABLE or PDFPLUMBER_AVAILABLE or PYMUPDF_AVAILABLE
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
 try:
     import pytesseract
     from PIL import Image
-    import io
-    OCR_AVAILABLE = True
+    PYTESSERACT_AVAILABLE = True
 except ImportError:
-    OCR_AVAILABLE = False
+    PYTESSERACT_AVAILABLE = False
 
-if not (PYPDF2_AVAILABLE or PDFPLUMBER_AVAILABLE or PYMUPDF_AVAILABLE):
+OCR_AVAILABLE = PYMUPDF_AVAILABLE and (TESSEROCR_AVAILABLE or PYTESSERACT_AVAILABLE)
+
+if not PDF_AVAILABLE:
     logger.warning("No PDF library found. Install one of: PyPDF2, pdfplumber, or PyMuPDF")
-    PDF_AVAILABLE = False
+
+# Text cleanup patterns, compiled once
+_RE_BLANK_LINES = re.compile(r'\n\s*\n')
+_RE_MULTISPACE = re.compile(r' {2,}')
+_RE_PAGE_MARKER = re.compile(r'\n--- Page \d+(?: \(OCR\))? ---\n')
+# Zero-width split points for camelCase joins and digit-letter joins, one pass for both
+_RE_JOINED_TOKENS = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=\d)(?=[A-Za-z])')
+_RE_OCR_ARTIFACTS = re.compile(r'[^\w\s\-.,;:()[\]{}\'\"!?@#$%^&*+=<>/\\|`~]')
+_RE_LINE_HYPHEN = re.compile(r'(\w)-\n(\w)')
+# Letter-spaced acronyms and names produced by some PDF encoders
+_SPORTS_TERMS = {
+    'S A I': 'SAI',
+    'T O P S': 'TOPS',
+    'N C O E': 'NCOE',
+    'K h e l o': 'Khelo',
+    'I n d i a': 'India'
+}
+_RE_SPORTS_TERMS = re.compile('|'.join(
+    re.escape(term) for term in sorted(_SPORTS_TERMS, key=len, reverse=True)))
+_RE_EMPTY_TABLE_ROW = re.compile(r'Table:\s*\|\s*\|\s*\|')
+_RE_TABLE_SEPARATOR = re.compile(r'\|\s*\|')
+
+# Bump to invalidate cached extractions when the cache format changes
+CACHE_VERSION = 3
+
+# Render scale for OCR pages (1.0 = 72 DPI)
+OCR_ZOOM = 2
+
+# A page counts as having a text layer above this many characters, and a
+# document skips OCR once at least this share of its pages has one
+TEXT_PAGE_MIN_CHARS = 20
+TEXT_PAGE_DENSITY = 0.5
+
+# PDFs in flight per worker; bounds how many finished results wait in memory
+PDF_WINDOW_PER_WORKER = 2
+
+# Documents with at least this many pages are split across worker processes
+PAGE_PARALLEL_MIN_PAGES = 16
+
+# Workers start from a clean forkserver (spawn where unavailable) rather than
+# forking the threaded server process; the server preloads this module so each
+# worker starts with PyMuPDF already imported
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _MP_CONTEXT = multiprocessing.get_context("forkserver")
+    _MP_CONTEXT.set_forkserver_preload([__name__])
+else:
+    _MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _init_worker_logging():
+    """Log straight to stderr from a worker process
+    
+    Forked workers inherit the parent's root handlers. A QueueHandler there
+    feeds a queue whose listener thread only runs in the parent, so its
+    records would be silently dropped.
+    """
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(handler)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        root.addHandler(handler)
+
+# Per-process processor used by the PDF worker pool
+_worker_processor = None
+_in_pdf_worker = False
+
+def _init_pdf_worker(config_manager: ConfigManager):
+    """Build the processor once per worker process"""
+    global _worker_processor, _in_pdf_worker
+    _init_worker_logging()
+    _worker_processor = EnhancedPDFProcessor(config_manager)
+    _in_pdf_worker = True
+
+def _process_one_pdf(pdf_path: str, st: os.stat_result) -> List[Dict[str, Any]]:
+    """Process a single PDF inside a worker process"""
+    return _worker_processor._process_pdf_file(pdf_path, st)
+
+def _pymupdf_page_text(page) -> str:
+    """Extract text and table content from a single PyMuPDF page"""
+    parts = [page.get_text()]
+    
+    # Also extract table content
+    tables = page.find_tables()
+    for table in tables:
+        try:
+            table_data = table.extract()
+            for row in table_data:
+                if row:
+                    table_text = " | ".join([str(cell) if cell else "" for cell in row])
+                    parts.append(f"\nTable: {table_text}\n")
+        except:
+            pass
+    
+    return "".join(parts)
+
+def _pymupdf_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Extract (page_num, text) pairs for a page range from its own document handle"""
+    with fitz.open(pdf_path) as doc:
+        return [(page_num, _pymupdf_page_text(doc[page_num])) for page_num in range(start, stop)]
+
+def _page_segments(page_count: int, workers: int) -> Tuple[List[int], List[int]]:
+    """Split a page count into contiguous (starts, stops) ranges, one per worker"""
+    step = -(-page_count // workers)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    return starts, stops
+
+# Per-process tesseract handle, loaded by the first OCR job a page worker runs
+_ocr_api = None
+
+def _ocr_page(doc, page_num: int, api=None) -> str:
+    """Render one page as grayscale and OCR it"""
+    # Render straight to 8-bit grayscale at 2x zoom (144 DPI); the raw
+    # samples go to tesseract without a PNG encode/decode round-trip
+    pix = doc[page_num].get_pixmap(matrix=fitz.Matrix(OCR_ZOOM, OCR_ZOOM), colorspace=fitz.csGRAY)
+    if api is not None:
+        api.SetImageBytes(pix.samples, pix.width, pix.height, 1, pix.stride)
+        return api.GetUTF8Text()
+    
+    image = Image.frombytes("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride)
+    return pytesseract.image_to_string(image, lang='eng')
+
+def _ocr_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """OCR a page range inside a page worker process"""
+    global _ocr_api
+    if _ocr_api is None and TESSEROCR_AVAILABLE:
+        _ocr_api = PyTessBaseAPI(lang='eng', psm=PSM.AUTO)
+    with fitz.open(pdf_path) as doc:
+        return [_ocr_page(doc, page_num, _ocr_api) for page_num in range(start, stop)]
+
+# PyMuPDF builds its font and cmap tables lazily; pay that once per process
+_pymupdf_warmed = False
+
+def _warm_pymupdf():
+    """Render a throwaway page so the first real PDF does not pay fitz start-up costs"""
+    global _pymupdf_warmed
+    if _pymupdf_warmed or not PYMUPDF_AVAILABLE:
+        return
+    _pymupdf_warmed = True
+    try:
+        with fitz.open() as doc:
+            page = doc.new_page()
+            page.insert_text((72, 72), "warm-up")
+            page.get_text()
+    except Exception as e:
+        logger.debug(f"PyMuPDF warm-up skipped: {e}")
 
 class EnhancedPDFProcessor:
     
     def __init__(self, config_manager: ConfigManager):
+        self.config_manager = config_manager
         self.config = config_manager.get_config()
         self.data_folder = self.config.pdf_data_path
         self.cache_dir = Path(self.config.cache_path) / "pdf_content"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.pdf_cache = {}
+        self._cache_db = None
+        self._page_pool: Optional[ProcessPoolExecutor] = None
+        # Bounded in-memory cache of extracted text, keyed by (path, size, mtime_ns)
+        self._extract_cached = lru_cache(maxsize=128)(self._extract_text_uncached)
+        _warm_pymupdf()
         
     def _get_file_hash(self, file_path: str) -> str:
         """Generate hash for file to detect changes"""
-        hash_md5 = hashlib.md5()
+        file_hash = xxhash.xxh3_64()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
     
-    def _get_cache_path(self, pdf_path: str) -> Path:
-        filename = Path(pdf_path).stem
-        return self.cache_dir / f"{filename}_processed.json"
+    def _get_cache_db(self) -> sqlite3.Connection:
+        """Open the PDF cache database lazily, once per process"""
+        if self._cache_db is None:
+            db = sqlite3.connect(self.cache_dir / "pdf_cache.db", isolation_level=None,
+                                 timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS pdfs ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT, "
+                "payload BLOB, processed_at TEXT, version INTEGER)"
+            )
+            self._cache_db = db
+        return self._cache_db
     
-    def _load_cached_content(self, pdf_path: str) -> Optional[Dict[str, Any]]:
+    def _load_cached_content(self, pdf_path: str,
+                             file_stat: Optional[Tuple[int, int]] = None) -> Optional[Dict[str, Any]]:
         if not self.config.enable_caching:
             return None
-            
-        cache_path = self._get_cache_path(pdf_path)
-        if not cache_path.exists():
-            return None
         
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
+            row = self._get_cache_db().execute(
+                "SELECT size, mtime_ns, hash, payload FROM pdfs WHERE path = ? AND version = ?",
+                (os.path.abspath(pdf_path), CACHE_VERSION)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            # A matching (size, mtime) fingerprint is enough; only hash on mismatch
+            size, mtime_ns, file_hash, payload = row
+            if file_stat is None:
+                st = os.stat(pdf_path)
+                file_stat = (st.st_size, st.st_mtime_ns)
+            if (size, mtime_ns) != file_stat:
+                if file_hash != self._get_file_hash(pdf_path):
+                    return None
+                # Same content under a new mtime (copied or touched); record the
+                # new fingerprint so the next run skips the hash again
+                self._get_cache_db().execute(
+                    "UPDATE pdfs SET size = ?, mtime_ns = ? WHERE path = ?",
+                    (*file_stat, os.path.abspath(pdf_path))
+                )
             
-            current_hash = self._get_file_hash(pdf_path)
-            if cached_data.get('file_hash') == current_hash:
-                logger.info(f"Using cached content for: {pdf_path}")
-                return cached_data
+            logger.info(f"Using cached content for: {pdf_path}")
+            return orjson.loads(payload)
         except Exception as e:
             logger.warning(f"Failed to load cache for {pdf_path}: {e}")
         
         return None
     
-    def _save_to_cache(self, pdf_path: str, processed_data: Dict[str, Any]):
+    def _save_to_cache(self, pdf_path: str, processed_data: Dict[str, Any],
+                       file_stat: Optional[Tuple[int, int]] = None):
         if not self.config.enable_caching:
             return
             
-        cache_path = self._get_cache_path(pdf_path)
         try:
-            processed_data['file_hash'] = self._get_file_hash(pdf_path)
-            processed_data['processed_at'] = datetime.now().isoformat()
-            
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(processed_data, f, indent=2, ensure_ascii=False)
+            if file_stat is None:
+                st = os.stat(pdf_path)
+                file_stat = (st.st_size, st.st_mtime_ns)
+            self._get_cache_db().execute(
+                "INSERT OR REPLACE INTO pdfs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(pdf_path), *file_stat, self._get_file_hash(pdf_path),
+                 orjson.dumps(processed_data),
+                 datetime.now().isoformat(), CACHE_VERSION)
+            )
         except Exception as e:
             logger.warning(f"Failed to cache content for {pdf_path}: {e}")
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        if pdf_path in self.pdf_cache:
-            return self.pdf_cache[pdf_path]
-            
+    def extract_text_from_pdf(self, pdf_path: str, st: Optional[os.stat_result] = None) -> str:
         try:
-            text_content = ""
+            # Keying on size and mtime drops stale entries as soon as the file changes
+            st = st or os.stat(pdf_path)
+            return self._extract_cached(pdf_path, st.st_size, st.st_mtime_ns)
+        except Exception as e:
+            logger.error(f"Error processing PDF {pdf_path}: {e}")
+            return f"Error reading PDF: {pdf_path}"
+    
+    def _extract_text_uncached(self, pdf_path: str, size: int, mtime_ns: int) -> str:
+        """Extract and clean text; exceptions propagate so they are never memoised"""
+        cached_data = self._load_cached_content(pdf_path, (size, mtime_ns))
+        if cached_data and cached_data.get('text'):
+            return cached_data['text']
+        
+        text_content = ""
+        text_density = None
+        
+        # Method 1: PyMuPDF (most robust); its per-page counts tell a text
+        # layer apart from a scanned document without re-parsing the file
+        if PYMUPDF_AVAILABLE:
+            try:
+                text_content, page_chars = self._extract_with_pymupdf(pdf_path)
+                text_density = (sum(chars > TEXT_PAGE_MIN_CHARS for chars in page_chars) / len(page_chars)
+                                if page_chars else 0.0)
+            except Exception as e:
+                logger.warning(f"_extract_with_pymupdf failed for {pdf_path}: {e}")
+        
+        if text_density is None:
             extraction_methods = []
             
-            # Method 1: PyMuPDF (most robust)
-            if 'PYMUPDF_AVAILABLE' in globals() and PYMUPDF_AVAILABLE:
-                extraction_methods.append(self._extract_with_pymupdf)
-            
-            # Method 2: pdfplumber (good for tables)
-            if 'PDFPLUMBER_AVAILABLE' in globals() and PDFPLUMBER_AVAILABLE:
+            # Method 2: pdfplumber (good for tables, but much slower; opt-in only)
+            if self.config.enable_pdfplumber_fallback and PDFPLUMBER_AVAILABLE:
                 extraction_methods.append(self._extract_with_pdfplumber)
                 
             # Method 3: PyPDF2 (fallback)
-            if 'PYPDF2_AVAILABLE' in globals() and PYPDF2_AVAILABLE:
+            if PYPDF2_AVAILABLE:
                 extraction_methods.append(self._extract_with_pypdf2)
             
-            # Try each extraction method
+            # Only reached when PyMuPDF is missing or could not open the file
             for method in extraction_methods:
                 try:
                     text_content = method(pdf_path)
@@ -132,65 +339,68 @@ class EnhancedPDFProcessor:
                 except Exception as e:
                     logger.warning(f"{method.__name__} failed for {pdf_path}: {e}")
                     continue
-            
-            # If all methods fail, try OCR as last resort
-            if not text_content or len(text_content.strip()) < 50:
-                if OCR_AVAILABLE:
-                    logger.info(f"Attempting OCR extraction for {pdf_path}")
-                    text_content = self._extract_with_ocr(pdf_path)
-                else:
-                    logger.warning(f"No extraction method worked for {pdf_path}. Consider installing OCR dependencies.")
-                    return f"Error: Could not extract text from {pdf_path}"
-            
-            # Clean and normalize text
-            text_content = self._clean_text(text_content)
-            
-            # Cache the result
-            self.pdf_cache[pdf_path] = text_content
-            
-            logger.info(f"Successfully extracted {len(text_content)} characters from {pdf_path}")
-            return text_content
-            
-        except Exception as e:
-            logger.error(f"Error processing PDF {pdf_path}: {e}")
-            return f"Error reading PDF: {pdf_path}"
+            has_text = len(text_content.strip()) > 50
+        else:
+            # A text layer on most pages is trusted even if short; OCR is only
+            # worth it when (nearly) no page carries any text
+            has_text = (text_density >= TEXT_PAGE_DENSITY
+                        or (text_density > 0 and len(text_content.strip()) > 50))
+            if has_text:
+                logger.info("Successfully extracted text using _extract_with_pymupdf")
+        
+        # Fall back to OCR for scanned documents
+        if not has_text:
+            if OCR_AVAILABLE:
+                logger.info(f"Attempting OCR extraction for {pdf_path}")
+                text_content = self._extract_with_ocr(pdf_path)
+            elif len(text_content.strip()) <= 50:
+                logger.warning(f"No extraction method worked for {pdf_path}. Consider installing OCR dependencies.")
+                raise ValueError(f"Could not extract text from {pdf_path}")
+        
+        # Clean and normalize text
+        text_content = self._clean_text(text_content)
+        
+        # Cache the result
+        self._save_to_cache(pdf_path, {'text': text_content}, (size, mtime_ns))
+        
+        logger.info(f"Successfully extracted {len(text_content)} characters from {pdf_path}")
+        return text_content
     
-    def _extract_with_pymupdf(self, pdf_path: str) -> str:
-        """Extract text using PyMuPDF (fitz)"""
-        import fitz
-        text_content = ""
+    def _extract_with_pymupdf(self, pdf_path: str) -> Tuple[str, List[int]]:
+        """Extract text using PyMuPDF (fitz), with the character count of every page"""
+        parts: List[str] = []
+        
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+        
+        max_workers = min(os.cpu_count() or 1, self.config.max_pdf_workers)
+        if page_count >= PAGE_PARALLEL_MIN_PAGES and max_workers > 1 and not _in_pdf_worker:
+            # PyMuPDF is not thread-safe, so split the page range over processes
+            # that each open their own handle on the document
+            starts, stops = _page_segments(page_count, max_workers)
+            executor = self._get_page_pool()
+            pages = [page for segment in executor.map(_pymupdf_page_range, repeat(pdf_path), starts, stops)
+                     for page in segment]
+        else:
+            pages = _pymupdf_page_range(pdf_path, 0, page_count)
         
-        doc = fitz.open(pdf_path)
-        for page_num in range(doc.page_count):
-            page = doc[page_num]
-            page_text = page.get_text()
-            
-            # Also extract table content
-            tables = page.find_tables()
-            for table in tables:
-                try:
-                    table_data = table.extract()
-                    for row in table_data:
-                        if row:
-                            table_text = " | ".join([str(cell) if cell else "" for cell in row])
-                            page_text += f"\nTable: {table_text}\n"
-                except:
-                    pass
-            
-            if page_text.strip():
-                text_content += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+        page_chars: List[int] = []
+        for page_num, page_text in pages:
+            stripped = page_text.strip()
+            page_chars.append(len(stripped))
+            if stripped:
+                parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
         
-        doc.close()
-        return text_content
+        return "".join(parts), page_chars
     
     def _extract_with_pdfplumber(self, pdf_path: str) -> str:
         """Extract text using pdfplumber (good for tables)"""
         import pdfplumber
-        text_content = ""
+        parts: List[str] = []
         
         with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages):
-                page_text = page.extract_text() or ""
+                page_parts = [page.extract_text() or ""]
                 
                 # Extract tables
                 tables = page.extract_tables()
@@ -199,50 +409,61 @@ class EnhancedPDFProcessor:
                         for row in table:
                             if row:
                                 table_text = " | ".join([str(cell) if cell else "" for cell in row])
-                                page_text += f"\nTable: {table_text}\n"
+                                page_parts.append(f"\nTable: {table_text}\n")
                 
+                page_text = "".join(page_parts)
                 if page_text.strip():
-                    text_content += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+                    parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
         
-        return text_content
+        return "".join(parts)
     
     def _extract_with_pypdf2(self, pdf_path: str) -> str:
         """Extract text using PyPDF2"""
         import PyPDF2
-        text_content = ""
+        parts: List[str] = []
         
         with open(pdf_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             for page_num, page in enumerate(pdf_reader.pages):
                 page_text = page.extract_text()
                 if page_text.strip():
-                    text_content += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+                    parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
         
-        return text_content
+        return "".join(parts)
     
     def _extract_with_ocr(self, pdf_path: str) -> str:
         """Extract text using OCR for scanned PDFs"""
-        import fitz
-        import pytesseract
-        from PIL import Image
-        import io
+        parts: List[str] = []
+        
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            max_pages = self.config.ocr_max_pages
+            if max_pages and page_count > max_pages:
+                logger.warning(f"OCR limited to the first {max_pages} of {page_count} pages of {pdf_path} "
+                               f"(raise ocr_max_pages to include more)")
+                page_count = max_pages
+            
+            max_workers = min(os.cpu_count() or 1, self.config.max_pdf_workers, page_count)
+            if max_workers <= 1 or _in_pdf_worker:
+                if TESSEROCR_AVAILABLE:
+                    # One API handle loads the language model once for all pages
+                    with PyTessBaseAPI(lang='eng', psm=PSM.AUTO) as api:
+                        ocr_texts = [_ocr_page(doc, page_num, api) for page_num in range(page_count)]
+                else:
+                    ocr_texts = [_ocr_page(doc, page_num) for page_num in range(page_count)]
         
-        text_content = ""
-        doc = fitz.open(pdf_path)
+        if max_workers > 1 and not _in_pdf_worker:
+            # OCR is CPU-bound per page; each worker loads tesseract once
+            starts, stops = _page_segments(page_count, max_workers)
+            executor = self._get_page_pool()
+            ocr_texts = [text for segment in executor.map(_ocr_page_range, repeat(pdf_path), starts, stops)
+                         for text in segment]
         
-        for page_num in range(min(doc.page_count, 5)):  # Limit OCR to first 5 pages
-            page = doc[page_num]
-            pix = page.get_pixmap()
-            img_data = pix.tobytes("png")
-            
-            image = Image.open(io.BytesIO(img_data))
-            ocr_text = pytesseract.image_to_string(image, lang='eng')
-            
+        for page_num, ocr_text in enumerate(ocr_texts):
             if ocr_text.strip():
-                text_content += f"\n--- Page {page_num + 1} (OCR) ---\n{ocr_text}\n"
+                parts.append(f"\n--- Page {page_num + 1} (OCR) ---\n{ocr_text}\n")
         
-        doc.close()
-        return text_content
+        return "".join(parts)
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize extracted text with enhanced processing"""
@@ -250,85 +471,158 @@ class EnhancedPDFProcessor:
             return ""
         
         # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
+        text = _RE_BLANK_LINES.sub('\n\n', text)
+        text = _RE_MULTISPACE.sub(' ', text)
         
         # Remove page headers/footers patterns
-        text = re.sub(r'\n--- Page \d+ ---\n', '\n\n', text)
-        text = re.sub(r'\n--- Page \d+ \(OCR\) ---\n', '\n\n', text)
+        text = _RE_PAGE_MARKER.sub('\n\n', text)
         
         # Fix common PDF extraction issues
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Add space between joined words
-        text = re.sub(r'(\d+)([A-Za-z])', r'\1 \2', text)  # Add space between numbers and letters
+        text = _RE_JOINED_TOKENS.sub(' ', text)  # Split joined words and number-letter runs
         
         # Clean up common OCR artifacts
-        text = re.sub(r'[^\w\s\-.,;:()[\]{}\'\"!?@#$%^&*+=<>/\\|`~]', ' ', text)
+        text = _RE_OCR_ARTIFACTS.sub(' ', text)
         
-        # Fix broken words (common in PDF extraction)
-        text = re.sub(r'(\w+)\s+(\w+)', lambda m: m.group(1) + m.group(2) if len(m.group(2)) == 1 else m.group(0), text)
+        # Rejoin words hyphenated across line breaks
+        text = _RE_LINE_HYPHEN.sub(r'\1\2', text)
         
         # Normalize sports-specific terms
-        sports_terms = {
-            'S A I': 'SAI',
-            'T O P S': 'TOPS',
-            'N C O E': 'NCOE',
-            'K h e l o': 'Khelo',
-            'I n d i a': 'India'
-        }
-        
-        for broken_term, correct_term in sports_terms.items():
-            text = text.replace(broken_term, correct_term)
+        text = _RE_SPORTS_TERMS.sub(lambda m: _SPORTS_TERMS[m.group(0)], text)
         
         # Clean table artifacts
-        text = re.sub(r'Table:\s*\|\s*\|\s*\|', '', text)  # Remove empty table rows
-        text = re.sub(r'\|\s*\|', '|', text)  # Clean table separators
+        text = _RE_EMPTY_TABLE_ROW.sub('', text)  # Remove empty table rows
+        text = _RE_TABLE_SEPARATOR.sub('|', text)  # Clean table separators
         
         return text.strip()
     
     def process_all_pdfs(self) -> List[Dict[str, Any]]:
         """Process all PDFs in the data folder and create document objects"""
-        documents = []
-        
+        return list(self.iter_all_chunks())
+    
+    def create_worker_pool(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """Process pool whose workers each build one processor; can be reused across runs"""
+        if max_workers is None:
+            max_workers = min(os.cpu_count() or 1, self.config.max_pdf_workers)
+        return ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=_MP_CONTEXT,
+                                   initializer=_init_pdf_worker,
+                                   initargs=(self.config_manager,))
+    
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        """Create the pool shared by page-range extraction and OCR on first use"""
+        if self._page_pool is None:
+            self._page_pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, self.config.max_pdf_workers),
+                                                  mp_context=_MP_CONTEXT,
+                                                  initializer=_init_worker_logging)
+            weakref.finalize(self, self._page_pool.shutdown, wait=False)
+        return self._page_pool
+    
+    def iter_all_chunks(self, executor: Optional[ProcessPoolExecutor] = None) -> Iterator[Dict[str, Any]]:
+        """Yield document chunks PDF by PDF, in path order
+        
+        At most PDF_WINDOW_PER_WORKER PDFs per worker are submitted at once, so
+        memory is bounded by that window of results rather than the whole folder.
+        The fixed order keeps a run's output the same however the workers finish.
+        executor should come from create_worker_pool; without one a pool is
+        created for this call when more than one PDF worker is useful.
+        """
         if not os.path.exists(self.data_folder):
             logger.error(f"Data folder not found: {self.data_folder}")
-            return documents
+            return
         
-        pdf_files = [f for f in os.listdir(self.data_folder) if f.lower().endswith('.pdf')]
+        # One scandir pass gives both paths and the stat used for cache validation
+        with os.scandir(self.data_folder) as it:
+            pdf_entries = sorted((entry for entry in it if entry.is_file() and entry.name.lower().endswith('.pdf')),
+                                 key=lambda entry: entry.path)
         
-        if not pdf_files:
+        if not pdf_entries:
             logger.warning(f"No PDF files found in {self.data_folder}")
-            return documents
+            return
+        
+        logger.info(f"Found {len(pdf_entries)} PDF files to process")
+        
+        pdf_paths = [entry.path for entry in pdf_entries]
+        pdf_stats = [entry.stat() for entry in pdf_entries]
+        max_workers = min(os.cpu_count() or 1, self.config.max_pdf_workers, len(pdf_paths))
+        chunk_count = 0
         
-        logger.info(f"Found {len(pdf_files)} PDF files to process")
+        owned_pool = None
+        if executor is None and max_workers > 1:
+            executor = owned_pool = self.create_worker_pool(max_workers)
         
-        for pdf_file in pdf_files:
-            pdf_path = os.path.join(self.data_folder, pdf_file)
+        pending = deque()
+        try:
+            if executor is not None:
+                # PDFs are independent and parsing is CPU-bound, so fan out across processes
+                results = self._iter_pool_results(executor, pdf_paths, pdf_stats, max(max_workers, 1), pending)
+            else:
+                results = map(self._process_pdf_file, pdf_paths, pdf_stats)
             
-            logger.info(f"Processing: {pdf_file}")
+            for pdf_documents in results:
+                chunk_count += len(pdf_documents)
+                yield from pdf_documents
+        finally:
+            # A consumer that stops early should not leave queued PDFs running
+            for future in pending:
+                future.cancel()
+            if owned_pool is not None:
+                owned_pool.shutdown()
+        
+        logger.info(f"Successfully processed {chunk_count} document chunks from {len(pdf_entries)} PDFs")
+    
+    def _iter_pool_results(self, executor: ProcessPoolExecutor, pdf_paths: List[str],
+                           pdf_stats: List[os.stat_result], workers: int, pending: deque) -> Iterator[List[Dict[str, Any]]]:
+        """Keep a bounded window of PDFs submitted and yield their results in submission order"""
+        jobs = zip(pdf_paths, pdf_stats)
+        window = workers * PDF_WINDOW_PER_WORKER
+        
+        for pdf_path, st in jobs:
+            pending.append(executor.submit(_process_one_pdf, pdf_path, st))
+            if len(pending) >= window:
+                break
+        
+        while pending:
+            result = pending[0].result()
+            pending.popleft()
+            # Refill before yielding so workers stay busy while the consumer runs
+            for pdf_path, st in jobs:
+                pending.append(executor.submit(_process_one_pdf, pdf_path, st))
+                break
+            yield result
+    
+    def _process_pdf_file(self, pdf_path: str, st: Optional[os.stat_result] = None) -> List[Dict[str, Any]]:
+        """Extract and chunk a single PDF into document objects"""
+        documents = []
+        pdf_file = os.path.basename(pdf_path)
+        
+        logger.info(f"Processing: {pdf_file}")
+        
+        # Extract text content
+        text_content = self.extract_text_from_pdf(pdf_path, st)
+        
+        if text_content and not text_content.startswith("Error"):
+            # Split content into chunks for better processing
+            chunks = self._split_into_chunks(text_content, max_chunk_size=2000)
             
-            # Extract text content
-            text_content = self.extract_text_from_pdf(pdf_path)
+            # Title and category depend only on the filename
+            title_base = self._get_document_title(pdf_file)
+            category = self._categorize_document(pdf_file)
             
-            if text_content and not text_content.startswith("Error"):
-                # Split content into chunks for better processing
-                chunks = self._split_into_chunks(text_content, max_chunk_size=2000)
-                
-                for i, chunk in enumerate(chunks):
-                    if chunk.strip():
-                        doc = {
-                            'title': f"{self._get_document_title(pdf_file)} - Part {i+1}",
-                            'text': chunk,
-                            'source': pdf_file,
-                            'category': self._categorize_document(pdf_file),
-                            'chunk_id': i,
-                            'total_chunks': len(chunks),
-                            'file_path': pdf_path
-                        }
-                        documents.append(doc)
-            else:
-                logger.warning(f"Failed to extract content from {pdf_file}")
+            for i, chunk in enumerate(chunks):
+                if chunk.strip():
+                    doc = {
+                        'title': f"{title_base} - Part {i+1}",
+                        'text': chunk,
+                        'source': pdf_file,
+                        'category': category,
+                        'chunk_id': i,
+                        'total_chunks': len(chunks),
+                        'file_path': pdf_path
+                    }
+                    documents.append(doc)
+        else:
+            logger.warning(f"Failed to extract content from {pdf_file}")
         
-        logger.info(f"Successfully processed {len(documents)} document chunks from {len(pdf_files)} PDFs")
         return documents
     
     def _split_into_chunks(self, text: str, max_chunk_size: int = 2000) -> List[str]:
@@ -337,88 +631,32 @@ class EnhancedPDFProcessor:
             return [text]
         
         chunks = []
-        current_chunk = ""
         overlap_size = int(max_chunk_size * 0.1)  # 10% overlap for context preservation
-        
-        # First, try to split by sections (headers, etc.)
-        sections = re.split(r'\n(?=[A-Z][A-Z\s]{5,})\n', text)  # Split on likely headers
-        
-        if len(sections) == 1:
-            # No clear sections, split by paragraphs
-            sections = text.split('\n\n')
-        
-        for i, section in enumerate(sections):
-            if len(current_chunk) + len(section) <= max_chunk_size:
-                current_chunk += section + '\n\n'
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                
-                # If section is too long, split by sentences
-                if len(section) > max_chunk_size:
-                    sentences = self._split_by_sentences(section, max_chunk_size)
-                    for j, sentence_chunk in enumerate(sentences):
-                        if j > 0 and chunks:
-                            # Add overlap from previous chunk
-                            prev_chunk_end = chunks[-1][-overlap_size:]
-                            sentence_chunk = prev_chunk_end + " " + sentence_chunk
-                        chunks.append(sentence_chunk)
-                    current_chunk = ""
-                else:
-                    # Add overlap from previous chunk if exists
-                    if chunks:
-                        prev_chunk_end = chunks[-1][-overlap_size:]
-                        current_chunk = prev_chunk_end + " " + section + '\n\n'
-                    else:
-                        current_chunk = section + '\n\n'
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        # Ensure no chunk is too small (merge with previous if possible)
-        final_chunks = []
-        for chunk in chunks:
-            if len(chunk.strip()) < 100 and final_chunks:
-                final_chunks[-1] += " " + chunk
-            else:
-                final_chunks.append(chunk)
-        
-        return final_chunks
-    
-    def _split_by_sentences(self, text: str, max_chunk_size: int) -> List[str]:
-        """Split text by sentences when paragraph splitting isn't enough"""
-        sentences = re.split(r'[.!?]+', text)
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            if len(current_chunk) + len(sentence) <= max_chunk_size:
-                current_chunk += sentence + '. '
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                
-                # If single sentence is too long, split by words
-                if len(sentence) > max_chunk_size:
-                    words = sentence.split()
-                    temp_chunk = ""
-                    for word in words:
-                        if len(temp_chunk) + len(word) <= max_chunk_size:
-                            temp_chunk += word + ' '
-                        else:
-                            if temp_chunk:
-                                chunks.append(temp_chunk.strip())
-                            temp_chunk = word + ' '
-                    current_chunk = temp_chunk
-                else:
-                    current_chunk = sentence + '. '
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        text_len = len(text)
+        start = 0
+        
+        # Greedy single pass: take up to max_chunk_size characters and cut at the
+        # last paragraph break, else sentence end, else word gap in the back half
+        while start < text_len:
+            end = min(start + max_chunk_size, text_len)
+            if end < text_len:
+                floor = start + max_chunk_size // 2
+                cut = text.rfind('\n\n', floor, end)
+                if cut == -1:
+                    cut = text.rfind('. ', floor, end)
+                    if cut != -1:
+                        cut += 1  # keep the full stop with its sentence
+                if cut == -1:
+                    cut = text.rfind(' ', floor, end)
+                if cut != -1:
+                    end = cut
+            
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= text_len:
+                break
+            start = max(end - overlap_size, start + 1)
         
         return chunks
     
@@ -1,22 +1,73 @@
 import os
+import re
 import sys
-from typing import List, Dict, Any
+import time
+import shutil
+import uuid
+from importlib.util import find_spec
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 import asyncio
 
 load_dotenv("./config/.env")
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
+from langchain.retrievers import ParentDocumentRetriever
+from langchain.storage import LocalFileStore, create_kv_docstore
+from langchain_community.vectorstores import Chroma, FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain.schema import Document
 
 from .config_manager import ConfigManager
 from .data_pipeline import PipelineManager
+from .onnx_embeddings import ONNXEmbeddings, ONNX_AVAILABLE
+from .semantic_cache import ExactCache, normalize_query
+
+FAISS_AVAILABLE = find_spec("faiss") is not None
+
+# Exact inner-product search is fast enough below this; HNSW above it
+FAISS_HNSW_MIN_VECTORS = 100_000
+FAISS_HNSW_M = 32
+FAISS_HNSW_EF_SEARCH = 64
+
+# Chroma's HNSW index: cosine on the normalized embeddings, with a cheaper
+# build than the defaults and search_ef matched to the FAISS setting
+CHROMA_HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 100,
+    "hnsw:M": 16,
+    "hnsw:search_ef": 64
+}
+
+# Each rebuild writes a fresh index directory under vector_store_path; the
+# pointer file names the active one so a failed build never touches it
+INDEX_POINTER_FILE = "CURRENT"
+INDEX_DIR_PREFIX = "index-"
+# index-<creation time in ns, zero-padded>-<random suffix>, so generations sort by age
+_RE_INDEX_DIR = re.compile(r'index-(\d{20})-[0-9a-f]{8}')
+
+_DOC_FMT = "Source: %s\nTitle: %s\nContent: %s"
+
+def format_docs(docs: List[Document]) -> str:
+    """Render retrieved documents as the prompt's context block"""
+    return "\n\n".join(
+        _DOC_FMT % (doc.metadata.get('source', 'Unknown'), doc.metadata.get('title', 'Unknown'), doc.page_content)
+        for doc in docs
+    )
+
+def _embedding_device() -> str:
+    """Run the embedding model on the GPU when PyTorch can see one"""
+    try:
+        import torch
+    except ImportError:
+        return 'cpu'
+    return 'cuda' if torch.cuda.is_available() else 'cpu'
 
 class LangChainRAGSystem:
     
@@ -26,9 +77,16 @@ class LangChainRAGSystem:
         self.pipeline_manager = PipelineManager(config_path)
         
         self.persist_directory = self.config.vector_store_path
+        self._set_index_directory(self._current_index_directory())
+        self.use_faiss = self.config.vector_store_backend == "faiss"
+        if self.use_faiss and not FAISS_AVAILABLE:
+            print("⚠️  faiss not installed, falling back to ChromaDB")
+            self.use_faiss = False
         self.vectorstore = None
         self.retriever = None
         self.chain = None
+        # Retrieved documents per normalized question, shared by the chain and the sources
+        self._retrieved = ExactCache(maxsize=512)
         
         self._setup_embeddings()
         self._setup_llm()
@@ -36,12 +94,25 @@ class LangChainRAGSystem:
         
     def _setup_embeddings(self):
         print("🔧 Setting up embeddings...")
+        
+        if self.config.embedding_backend == "onnx":
+            if ONNX_AVAILABLE:
+                self.embeddings = ONNXEmbeddings(
+                    model_name=self.config.embedding_model,
+                    cache_dir=os.path.join(self.config.cache_path, "onnx"),
+                    batch_size=self.config.embedding_batch_size
+                )
+                print("✅ Embeddings ready (ONNX Runtime, INT8)")
+                return
+            print("⚠️  optimum[onnxruntime] not installed, falling back to PyTorch embeddings")
+        
+        device = _embedding_device()
         self.embeddings = HuggingFaceEmbeddings(
             model_name=self.config.embedding_model,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
+            model_kwargs={'device': device},
+            encode_kwargs={'normalize_embeddings': True, 'batch_size': self.config.embedding_batch_size}
         )
-        print("✅ Embeddings ready")
+        print(f"✅ Embeddings ready ({device})")
     
     def _setup_llm(self):
         print("🤖 Setting up Gemini LLM...")
@@ -64,65 +135,301 @@ class LangChainRAGSystem:
             length_function=len,
             separators=["\n\n", "\n", " ", ""]
         )
+        self.parent_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.config.parent_chunk_size,
+            chunk_overlap=self.config.chunk_overlap,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""]
+        )
     
     async def load_and_index_documents(self, force_reload=False):
         print("📚 Loading and indexing documents...")
         
-        if os.path.exists(self.persist_directory) and not force_reload:
+        index_path = self.faiss_directory if self.use_faiss else self.index_directory
+        
+        if os.path.exists(index_path) and not force_reload:
             print("📂 Loading existing vector store...")
-            self.vectorstore = Chroma(
-                persist_directory=self.persist_directory,
-                embedding_function=self.embeddings
-            )
+            self.vectorstore = await asyncio.to_thread(self._load_vectorstore)
         else:
             print("🔄 Creating new vector store...")
             
-            # Use the new data pipeline to get documents
-            documents = await self.pipeline_manager.run_pipeline(force_refresh=force_reload)
-            
-            if not documents:
-                raise ValueError("No documents found to index")
+            # Build into a new index directory; the active one keeps serving queries
+            previous_directory = self.index_directory
+            self._set_index_directory(os.path.join(self.persist_directory, f"{INDEX_DIR_PREFIX}{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"))
+            self.vectorstore = None
             
-            # Convert to LangChain documents
-            langchain_docs = []
-            for doc in documents:
-                langchain_doc = Document(
-                    page_content=doc['text'],
-                    metadata={
-                        'title': doc['title'],
-                        'source': doc['source'],
-                        'category': doc['category'],
-                        'document_id': doc.get('document_id', ''),
-                        'data_source': doc.get('data_source', 'unknown'),
-                        'chunk_id': doc.get('chunk_id', 0)
-                    }
-                )
-                langchain_docs.append(langchain_doc)
-            
-            print(f"📄 Processing {len(langchain_docs)} document chunks...")
-            
-            # Split documents further if needed
-            split_docs = self.text_splitter.split_documents(langchain_docs)
-            print(f"📑 Created {len(split_docs)} text chunks")
-            
-            # Create vector store
-            self.vectorstore = Chroma.from_documents(
-                documents=split_docs,
-                embedding=self.embeddings,
-                persist_directory=self.persist_directory
-            )
+            try:
+                document_count = chunk_count = 0
+                # Each pipeline batch is split, embedded and indexed before the next
+                # is taken, so the corpus is never held in memory at once and PDF
+                # workers keep parsing ahead while a batch is embedded
+                async for documents in self.pipeline_manager.iter_pipeline_batches(
+                        force_refresh=force_reload, batch_size=self.config.chroma_batch_size):
+                    texts, metadatas = await asyncio.to_thread(self._split_documents, documents)
+                    await self._index_chunks(texts, metadatas)
+                    document_count += len(documents)
+                    chunk_count += len(texts)
+                    print(f"📑 Indexed {chunk_count} text chunks from {document_count} documents")
+                
+                if self.vectorstore is None:
+                    raise ValueError("No documents found to index")
+                
+                # Persist the vector store
+                await asyncio.to_thread(self._persist_vectorstore)
+            except Exception:
+                shutil.rmtree(self.index_directory, ignore_errors=True)
+                raise
             
-            # Persist the vector store
-            self.vectorstore.persist()
+            self._activate_index_directory(previous_directory)
             print("💾 Vector store saved to disk")
         
         # Setup retriever
-        self.retriever = self.vectorstore.as_retriever(
+        self.retriever = self._build_retriever()
+        self._retrieved.clear()
+        
+        print("✅ Document indexing complete")
+    
+    def _current_index_directory(self) -> str:
+        """Active index directory, or the store root for an index built before generations"""
+        try:
+            with open(os.path.join(self.persist_directory, INDEX_POINTER_FILE), encoding='utf-8') as f:
+                return os.path.join(self.persist_directory, f.read().strip())
+        except FileNotFoundError:
+            return self.persist_directory
+    
+    def _set_index_directory(self, index_directory: str):
+        self.index_directory = index_directory
+        self.faiss_directory = os.path.join(index_directory, "faiss")
+        self.parent_directory = os.path.join(index_directory, "parents")
+    
+    def _activate_index_directory(self, previous_directory: str):
+        """Point the store at the freshly built index and drop generations older than the replaced one
+        
+        The index being replaced is kept: a running app queries it until it
+        swaps in this system, so it is only removed by the next rebuild. Newer
+        directories may be another build still in progress and are left alone.
+        """
+        pointer = os.path.join(self.persist_directory, INDEX_POINTER_FILE)
+        with open(pointer + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(os.path.basename(self.index_directory))
+        os.replace(pointer + ".tmp", pointer)
+        
+        previous = _RE_INDEX_DIR.fullmatch(os.path.basename(previous_directory))
+        if previous is None:
+            # Replacing an index from before generations; nothing older is ours
+            return
+        
+        for name in os.listdir(self.persist_directory):
+            match = _RE_INDEX_DIR.fullmatch(name)
+            if match and match.group(1) < previous.group(1):
+                shutil.rmtree(os.path.join(self.persist_directory, name), ignore_errors=True)
+    
+    def _split_documents(self, documents: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Split pipeline documents straight into parallel chunk text and metadata lists
+        
+        Chunks of one document share its metadata dict instead of each getting a
+        Document copy. With parent-child chunking, parents go to the parent
+        docstore and each child's metadata carries its parent_id.
+        """
+        texts: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        parents: List[Tuple[str, Document]] = []
+        merged_count = 0
+        
+        for doc in documents:
+            metadata = {
+                'title': doc['title'],
+                'source': doc['source'],
+                'category': doc['category'],
+                'document_id': doc.get('document_id', ''),
+                'data_source': doc.get('data_source', 'unknown'),
+                'chunk_id': doc.get('chunk_id', 0)
+            }
+            
+            if self.config.enable_parent_child_chunking:
+                sections = []
+                for parent_text in self.parent_splitter.split_text(doc['text']):
+                    parent_id = str(uuid.uuid4())
+                    parents.append((parent_id, Document(page_content=parent_text, metadata=metadata)))
+                    sections.append((parent_text, {**metadata, 'parent_id': parent_id}))
+            else:
+                sections = [(doc['text'], metadata)]
+            
+            for text, section_metadata in sections:
+                chunks = self.text_splitter.split_text(text)
+                regular_chunks = self._regularize_chunks(chunks)
+                merged_count += len(chunks) - len(regular_chunks)
+                texts.extend(regular_chunks)
+                metadatas.extend([section_metadata] * len(regular_chunks))
+        
+        if merged_count:
+            print(f"🧩 Merged {merged_count} undersized chunks")
+        
+        if self.config.enable_parent_child_chunking:
+            # Written into the new index directory, next to the children that reference them
+            self._get_parent_docstore().mset(parents)
+            print(f"👪 Stored {len(parents)} parent chunks")
+        
+        return texts, metadatas
+    
+    def _regularize_chunks(self, chunks: List[str]) -> List[str]:
+        """Merge chunks of one document below min_chunk_size into a neighbouring chunk"""
+        max_size = int(self.config.chunk_size * 1.1)
+        merged = []
+        
+        for chunk in chunks:
+            if merged and min(len(merged[-1]), len(chunk)) < self.config.min_chunk_size:
+                # Neighbouring chunks repeat up to chunk_overlap characters; keep one copy
+                overlap = self._chunk_overlap(merged[-1], chunk)
+                tail = chunk[overlap:] if overlap else " " + chunk
+                
+                if len(merged[-1]) + len(tail) <= max_size:
+                    merged[-1] += tail
+                    continue
+            merged.append(chunk)
+        
+        return merged
+    
+    def _chunk_overlap(self, prev: str, text: str) -> int:
+        """Length of the word-aligned text that ends prev and starts text"""
+        for size in range(min(self.config.chunk_overlap, len(prev), len(text)), 0, -1):
+            if ((size == len(prev) or prev[-size - 1].isspace())
+                    and (size == len(text) or text[size].isspace())
+                    and prev.endswith(text[:size])):
+                return size
+        return 0
+    
+    def _get_parent_docstore(self):
+        return create_kv_docstore(LocalFileStore(self.parent_directory))
+    
+    def _build_retriever(self):
+        search_kwargs = {"k": self.config.similarity_top_k if hasattr(self.config, 'similarity_top_k') else 5}
+        
+        if self.config.enable_parent_child_chunking:
+            if os.path.exists(self.parent_directory):
+                # Searches the child chunks, returns their unique parents
+                return ParentDocumentRetriever(
+                    vectorstore=self.vectorstore,
+                    docstore=self._get_parent_docstore(),
+                    child_splitter=self.text_splitter,
+                    parent_splitter=self.parent_splitter,
+                    id_key="parent_id",
+                    search_kwargs=search_kwargs
+                )
+            print("⚠️  Index has no parent chunks, reindex to use parent-child retrieval")
+        
+        return self.vectorstore.as_retriever(
             search_type="similarity",
-            search_kwargs={"k": self.config.similarity_top_k if hasattr(self.config, 'similarity_top_k') else 5}
+            search_kwargs=search_kwargs
         )
+    
+    async def _aembed_batches(self, texts: List[str]) -> List[List[float]]:
+        """Embed length-sorted batches concurrently on worker threads, keeping input order"""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        # A sentence-transformers model is not safe to call from several threads
+        # at once; ONNX Runtime sessions are, so one batch can be tokenized
+        # while another runs through the model
+        concurrency = self.config.embedding_concurrency if isinstance(self.embeddings, ONNXEmbeddings) else 1
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
         
-        print("✅ Document indexing complete")
+        async def embed_batch(batch: List[int]):
+            async with semaphore:
+                batch_vectors = await asyncio.to_thread(self.embeddings.embed_documents, [texts[i] for i in batch])
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+        
+        batch_size = self.config.embedding_batch_size
+        await asyncio.gather(*(
+            embed_batch(order[start:start + batch_size])
+            for start in range(0, len(order), batch_size)
+        ))
+        
+        return vectors
+    
+    def _persist_vectorstore(self):
+        if self.use_faiss:
+            self._promote_faiss_index()
+            self.vectorstore.save_local(self.faiss_directory)
+        else:
+            self.vectorstore.persist()
+    
+    def _load_vectorstore(self):
+        if self.use_faiss:
+            # Only ever loads the index this system wrote with save_local
+            return FAISS.load_local(
+                self.faiss_directory,
+                self.embeddings,
+                allow_dangerous_deserialization=True,
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+        
+        return Chroma(
+            persist_directory=self.index_directory,
+            embedding_function=self.embeddings
+        )
+    
+    async def _index_chunks(self, texts: List[str], metadatas: List[Dict[str, Any]]):
+        """Embed one batch of chunks and add it to the index being built"""
+        if not texts:
+            return
+        embeddings = await self._aembed_batches(texts)
+        
+        # Index inserts are synchronous; keep them off the event loop
+        await asyncio.to_thread(self._add_to_vectorstore, texts, metadatas, embeddings)
+    
+    def _add_to_vectorstore(self, texts: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]):
+        if self.vectorstore is None:
+            self.vectorstore = self._new_faiss(len(embeddings[0])) if self.use_faiss else self._new_chroma()
+        
+        if self.use_faiss:
+            self.vectorstore.add_embeddings(zip(texts, embeddings), metadatas=metadatas)
+            return
+        
+        batch_size = self.config.chroma_batch_size
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            self.vectorstore._collection.add(
+                ids=[str(uuid.uuid4()) for _ in range(start, min(end, len(texts)))],
+                embeddings=embeddings[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end]
+            )
+    
+    def _new_faiss(self, dim: int) -> FAISS:
+        import faiss
+        
+        # Embeddings are L2-normalized, so inner product is cosine similarity.
+        # The final size is unknown while batches stream in, so the build starts
+        # flat and _promote_faiss_index moves large indexes onto HNSW at the end
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=faiss.IndexFlatIP(dim),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+    
+    def _promote_faiss_index(self):
+        """Rebuild a flat index of at least FAISS_HNSW_MIN_VECTORS as HNSW"""
+        import faiss
+        
+        flat = self.vectorstore.index
+        if flat.ntotal < FAISS_HNSW_MIN_VECTORS:
+            return
+        
+        index = faiss.IndexHNSWFlat(flat.d, FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
+        # Same insertion order, so index_to_docstore_id still lines up
+        index.add(flat.reconstruct_n(0, flat.ntotal))
+        self.vectorstore.index = index
+    
+    def _new_chroma(self) -> Chroma:
+        return Chroma(
+            persist_directory=self.index_directory,
+            embedding_function=self.embeddings,
+            collection_metadata=CHROMA_HNSW_METADATA
+        )
     
     def setup_rag_chain(self):
         print("⛓️ Setting up RAG chain...")
@@ -148,19 +455,12 @@ ANSWER:"""
 
         prompt = ChatPromptTemplate.from_template(template)
         
-        def format_docs(docs):
-            return "\n\n".join([
-                f"Source: {doc.metadata.get('source', 'Unknown')}\n"
-                f"Title: {doc.metadata.get('title', 'Unknown')}\n"
-                f"Content: {doc.page_content}"
-                for doc in docs
-            ])
-        
+        # Answers from context the caller already retrieved
+        self.answer_chain = prompt | self.llm | StrOutputParser()
         self.chain = (
-            {"context": self.retriever | format_docs, "question": RunnablePassthrough()}
-            | prompt
-            | self.llm
-            | StrOutputParser()
+            {"context": RunnableLambda(lambda question: format_docs(self.retrieve_documents(question))),
+             "question": RunnablePassthrough()}
+            | self.answer_chain
         )
         
         print("✅ RAG chain ready")
@@ -171,10 +471,50 @@ ANSWER:"""
         
         print(f"🔍 Processing query: {question}")
         
-        relevant_docs = self.retriever.invoke(question)
-        response = self.chain.invoke(question)
+        # Retrieved once, for both the prompt context and the sources
+        relevant_docs = self.retrieve_documents(question)
+        response = self.answer_chain.invoke({"context": format_docs(relevant_docs), "question": question})
+        
+        return self._build_result(question, response, relevant_docs)
+    
+    async def aquery(self, question: str, query_vector: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Async variant of query, so concurrent callers can overlap their LLM calls
         
-        result = {
+        A caller that already embedded the question passes query_vector so it is
+        not embedded a second time for retrieval.
+        """
+        if not self.chain:
+            raise ValueError("RAG chain not setup. Call setup_rag_chain() first.")
+        
+        print(f"🔍 Processing query: {question}")
+        
+        relevant_docs = await asyncio.to_thread(self.retrieve_documents, question, query_vector)
+        response = await self.answer_chain.ainvoke({"context": format_docs(relevant_docs), "question": question})
+        
+        return self._build_result(question, response, relevant_docs)
+    
+    def retrieve_documents(self, question: str, query_vector: Optional[List[float]] = None) -> List[Document]:
+        docs = self._retrieved.get(question)
+        if docs is None:
+            if query_vector is not None:
+                docs = tuple(self._retrieve_by_vector(query_vector))
+            else:
+                docs = tuple(self.retriever.invoke(normalize_query(question)))
+            self._retrieved.put(question, docs)
+        return list(docs)
+    
+    def _retrieve_by_vector(self, query_vector: List[float]) -> List[Document]:
+        """Same search as the retriever, from an embedding the caller already has"""
+        docs = self.vectorstore.similarity_search_by_vector(query_vector, k=self.retriever.search_kwargs.get("k", 5))
+        
+        if isinstance(self.retriever, ParentDocumentRetriever):
+            # Unique parents in child rank order, as ParentDocumentRetriever returns them
+            parent_ids = list(dict.fromkeys(doc.metadata["parent_id"] for doc in docs if "parent_id" in doc.metadata))
+            return [doc for doc in self.retriever.docstore.mget(parent_ids) if doc is not None]
+        return docs
+    
+    def _build_result(self, question: str, response: str, relevant_docs: List[Document]) -> Dict[str, Any]:
+        return {
             'question': question,
             'answer': response,
             'sources': [
@@ -187,15 +527,15 @@ ANSWER:"""
             ],
             'num_sources': len(relevant_docs)
         }
-        
-        return result
     
     def get_stats(self) -> Dict[str, Any]:
         if not self.vectorstore:
             return {"error": "Vector store not initialized"}
         
-        collection = self.vectorstore._collection
-        count = collection.count()
+        if self.use_faiss:
+            count = self.vectorstore.index.ntotal
+        else:
+            count = self.vectorstore._collection.count()
         
         pipeline_stats = self.pipeline_manager.get_pipeline_status()
         
@@ -203,8 +543,8 @@ ANSWER:"""
             'total_chunks': count,
             'embedding_model': self.config.embedding_model,
             'llm_model': self.config.llm_model,
-            'vector_store': "ChromaDB",
-            'persist_directory': self.persist_directory,
+            'vector_store': "FAISS" if self.use_faiss else "ChromaDB",
+            'persist_directory': self.index_directory,
             'pipeline_stats': pipeline_stats
         }
 
@@ -213,7 +553,8 @@ async def initialize_rag_system(config_path="./config.yaml", force_reload=False)
     print("=" * 50)
     
     try:
-        rag_system = LangChainRAGSystem(config_path)
+        # Loading the embedding model and LLM client blocks; do it on a worker thread
+        rag_system = await asyncio.to_thread(LangChainRAGSystem, config_path)
         await rag_system.load_and_index_documents(force_reload=force_reload)
         rag_system.setup_rag_chain()
         
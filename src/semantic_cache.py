@@ -0,0 +1,97 @@
+"""
+Response caches placed in front of the RAG system.
+
+ExactCache answers repeated questions (after case and whitespace
+normalization) without touching the models. SemanticCache answers
+near-identical questions by comparing query embeddings, which costs one
+embedding call instead of a retrieval plus a Gemini round-trip.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key for a question"""
+    return " ".join(query.lower().split())
+
+class ExactCache:
+    """Thread-safe LRU of query results keyed on the normalized question"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        key = normalize_query(query)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, query: str, result: Dict[str, Any]):
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SemanticCache:
+    """Thread-safe cache of query results keyed on query embeddings
+
+    Embeddings are L2-normalized and kept in one preallocated matrix, so a
+    lookup is a single matrix-vector product. Once full, the oldest entry is
+    overwritten.
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 512):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._vectors: Optional[np.ndarray] = None
+        self._results: List[Optional[Dict[str, Any]]] = [None] * maxsize
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, query_vector: Sequence[float]) -> Optional[Dict[str, Any]]:
+        vec = self._normalize(query_vector)
+        with self._lock:
+            if not self._size or self._vectors.shape[1] != vec.shape[0]:
+                return None
+            scores = self._vectors[:self._size] @ vec
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._results[best]
+        return None
+
+    def put(self, query_vector: Sequence[float], result: Dict[str, Any]):
+        vec = self._normalize(query_vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vec.shape[0]:
+                self._vectors = np.zeros((self.maxsize, vec.shape[0]), dtype=np.float32)
+                self._size = self._next = 0
+            self._vectors[self._next] = vec
+            self._results[self._next] = result
+            self._next = (self._next + 1) % self.maxsize
+            self._size = min(self._size + 1, self.maxsize)
+
+    def clear(self):
+        with self._lock:
+            self._vectors = None
+            self._results = [None] * self.maxsize
+            self._size = self._next = 0
@@ -1,19 +1,51 @@
 import asyncio
 import aiohttp
-import time
+import os
 import hashlib
-import json
 import re
-from typing import List, Dict, Any, Optional, Set
+import sqlite3
+from typing import List, Dict, Any, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse, urlunparse
+from importlib.util import find_spec
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime
 import logging
 
+import orjson
+import xxhash
 from bs4 import BeautifulSoup
 from .config_manager import ConfigManager
 
+# lxml's C parser is several times faster than the pure-Python html.parser
+HTML_PARSER = 'lxml' if find_spec("lxml") is not None else 'html.parser'
+
+# Anchors that never lead to crawlable HTML pages
+_RE_SKIP_LINK = re.compile(r'#|javascript:|mailto:|tel:|\.pdf|\.doc|\.jpg|\.png')
+
+# Sites (and their subdomains) the crawler is allowed to follow links into
+_ALLOWED_DOMAINS = frozenset({
+    'sportsauthorityofindia.nic.in',
+    'kheloindia.gov.in',
+    'fitindia.gov.in',
+    'yas.nic.in',  # Youth Affairs and Sports
+    'sportstechnology.gov.in'
+})
+_ALLOWED_DOMAIN_SUFFIXES = tuple('.' + domain for domain in _ALLOWED_DOMAINS)
+
+# Crawl stages: concurrent downloads feed a bounded queue of pages to parse
+# on worker threads
+CRAWL_FETCH_WORKERS = 10
+CRAWL_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+PARSE_QUEUE_SIZE = 64
+
+# Scraped pages buffered before a cache transaction
+CACHE_FLUSH_SIZE = 50
+
+def _url_fingerprint(url: str) -> int:
+    """64-bit URL fingerprint for seen-URL sets; a fixed-size int instead of the whole string"""
+    return xxhash.xxh3_64_intdigest(url.encode())
+
 @dataclass
 class ScrapedContent:
     url: str
@@ -22,14 +54,48 @@ class ScrapedContent:
     metadata: Dict[str, Any]
     scraped_at: str
     content_hash: str
+    hyperlinks: Optional[List[str]] = None  # None for pages cached before links were stored
 
 class WebScraper:
+    # Sports-specific keywords with weights, flattened once for relevance scoring
+    RELEVANCE_KEYWORDS = tuple(
+        (keyword, weight)
+        for keywords, weight in (
+            (['sports authority of india', 'sai', 'athlete', 'training', 'coaching',
+              'olympic', 'commonwealth', 'national games', 'talent identification',
+              'sports science', 'fitness assessment', 'khelo india', 'tops'], 3.0),
+            (['sports', 'fitness', 'exercise', 'physical', 'performance',
+              'competition', 'tournament', 'championship', 'medal', 'academy'], 2.0),
+            (['health', 'nutrition', 'wellness', 'youth', 'development',
+              'infrastructure', 'facility', 'equipment', 'program', 'scheme'], 1.0)
+        )
+        for keyword in keywords
+    )
+    
+    # Bonus for sports-specific phrases
+    BONUS_PHRASES = (
+        'sports development', 'athlete development', 'sports training',
+        'national coach', 'sports facility', 'fitness standards',
+        'talent scouting', 'sports policy', 'annual report'
+    )
+    
+    # Priority links (more likely to have valuable content)
+    LINK_PRIORITY_KEYWORDS = (
+        'about', 'scheme', 'program', 'training', 'facility', 'athlete',
+        'sport', 'fitness', 'talent', 'development', 'policy', 'guideline',
+        'annual report', 'document', 'circular', 'notification', 'news',
+        'achievement', 'infrastructure', 'centre', 'academy', 'course'
+    )
+    
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager.get_config()
         self.session = None
-        self.scraped_urls: Set[str] = set()
+        self.scraped_urls: Set[int] = set()  # URL fingerprints
         self.cache_dir = Path(self.config.cache_path) / "web_content"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_db = None
+        # Pages scraped since the last flush, written to the cache in one transaction
+        self._pending_cache: Dict[str, bytes] = {}
         
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -53,46 +119,76 @@ class WebScraper:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        self._flush_cache()
+        if self._cache_db is not None:
+            self._cache_db.close()
+            self._cache_db = None
+    
+    def _get_cache_key(self, url: str) -> str:
+        # Keyed by URL MD5 like the per-URL JSON files, so those still resolve
+        return hashlib.md5(url.encode()).hexdigest()
     
     def _get_cache_path(self, url: str) -> Path:
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        return self.cache_dir / f"{url_hash}.json"
+        """Legacy per-URL JSON cache file, read when a page is not in the database"""
+        return self.cache_dir / f"{self._get_cache_key(url)}.json"
     
-    def _is_content_cached(self, url: str) -> bool:
-        cache_path = self._get_cache_path(url)
-        return cache_path.exists()
+    def _get_cache_db(self) -> sqlite3.Connection:
+        """Open the web cache database lazily"""
+        if self._cache_db is None:
+            db = sqlite3.connect(self.cache_dir / "cache.db", isolation_level=None, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS cache (url_hash TEXT PRIMARY KEY, payload BLOB)")
+            self._cache_db = db
+        return self._cache_db
     
     def _load_cached_content(self, url: str) -> Optional[ScrapedContent]:
         if not self.config.enable_caching:
             return None
         
-        cache_path = self._get_cache_path(url)
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return ScrapedContent(**data)
-            except Exception as e:
-                self.logger.warning(f"Failed to load cached content for {url}: {e}")
+        key = self._get_cache_key(url)
+        try:
+            payload = self._pending_cache.get(key)
+            if payload is None:
+                row = self._get_cache_db().execute(
+                    "SELECT payload FROM cache WHERE url_hash = ?", (key,)
+                ).fetchone()
+                payload = row[0] if row else None
+            if payload is not None:
+                return ScrapedContent(**orjson.loads(payload))
+            
+            cache_path = self._get_cache_path(url)
+            if cache_path.exists():
+                content = ScrapedContent(**orjson.loads(cache_path.read_bytes()))
+                # Move the page into the database; the JSON file is left untouched
+                self._save_to_cache(content)
+                return content
+        except Exception as e:
+            self.logger.warning(f"Failed to load cached content for {url}: {e}")
         return None
     
     def _save_to_cache(self, content: ScrapedContent):
         if not self.config.enable_caching:
             return
         
-        cache_path = self._get_cache_path(content.url)
+        self._pending_cache[self._get_cache_key(content.url)] = orjson.dumps(asdict(content))
+        if len(self._pending_cache) >= CACHE_FLUSH_SIZE:
+            self._flush_cache()
+    
+    def _flush_cache(self):
+        """Write pending pages to the cache database in a single transaction"""
+        if not self._pending_cache:
+            return
+        
+        db = self._get_cache_db()
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'url': content.url,
-                    'title': content.title,
-                    'content': content.content,
-                    'metadata': content.metadata,
-                    'scraped_at': content.scraped_at,
-                    'content_hash': content.content_hash
-                }, f, indent=2, ensure_ascii=False)
+            db.execute("BEGIN")
+            db.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?)", self._pending_cache.items())
+            db.execute("COMMIT")
+            self._pending_cache.clear()
         except Exception as e:
-            self.logger.warning(f"Failed to cache content for {content.url}: {e}")
+            db.execute("ROLLBACK")
+            self.logger.warning(f"Failed to write {len(self._pending_cache)} pages to the cache: {e}")
     
     def _extract_text_content(self, soup: BeautifulSoup) -> str:
         # Remove unwanted elements
@@ -111,43 +207,18 @@ class WebScraper:
         content_lower = content.lower()
         title_lower = title.lower()
         
-        # Sports-specific keywords with weights
-        sports_keywords = {
-            'high_priority': ['sports authority of india', 'sai', 'athlete', 'training', 'coaching', 
-                            'olympic', 'commonwealth', 'national games', 'talent identification',
-                            'sports science', 'fitness assessment', 'khelo india', 'tops'],
-            'medium_priority': ['sports', 'fitness', 'exercise', 'physical', 'performance',
-                              'competition', 'tournament', 'championship', 'medal', 'academy'],
-            'low_priority': ['health', 'nutrition', 'wellness', 'youth', 'development', 
-                           'infrastructure', 'facility', 'equipment', 'program', 'scheme']
-        }
-        
         score = 0.0
         word_count = len(content.split())
         
-        # Score based on keyword frequency
-        for priority, keywords in sports_keywords.items():
-            weight = 3.0 if priority == 'high_priority' else 2.0 if priority == 'medium_priority' else 1.0
-            
-            for keyword in keywords:
-                # Count occurrences in content
-                content_count = content_lower.count(keyword)
-                title_count = title_lower.count(keyword) * 2  # Title keywords get double weight
-                
-                score += (content_count + title_count) * weight
+        # Score based on keyword frequency; title keywords get double weight
+        for keyword, weight in self.RELEVANCE_KEYWORDS:
+            score += (content_lower.count(keyword) + title_lower.count(keyword) * 2) * weight
         
         # Normalize by content length
         if word_count > 0:
             score = score / (word_count / 100)  # Per 100 words
         
-        # Bonus for sports-specific phrases
-        bonus_phrases = [
-            'sports development', 'athlete development', 'sports training',
-            'national coach', 'sports facility', 'fitness standards',
-            'talent scouting', 'sports policy', 'annual report'
-        ]
-        
-        for phrase in bonus_phrases:
+        for phrase in self.BONUS_PHRASES:
             if phrase in content_lower:
                 score += 5.0
         
@@ -173,152 +244,207 @@ class WebScraper:
     
     def _extract_hyperlinks(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extract relevant hyperlinks with enhanced discovery"""
-        links = []
+        priority_links = []
+        other_links = []
         
         # Get all links
         for link in soup.find_all('a', href=True):
             href = link['href']
             
             # Skip unwanted links
-            if any(skip in href for skip in ['#', 'javascript:', 'mailto:', 'tel:', '.pdf', '.doc', '.jpg', '.png']):
+            if _RE_SKIP_LINK.search(href):
                 continue
             
             full_url = urljoin(base_url, href)
-            parsed = urlparse(full_url)
+            hostname = urlparse(full_url).hostname
             
             # Only include relevant domains
-            if parsed.netloc and any(domain in parsed.netloc for domain in [
-                'sportsauthorityofindia.nic.in',
-                'kheloindia.gov.in', 
-                'fitindia.gov.in',
-                'yas.nic.in',  # Youth Affairs and Sports
-                'sportstechnology.gov.in'
-            ]):
-                # Priority links (more likely to have valuable content)
-                link_text = link.get_text().lower()
-                priority_keywords = [
-                    'about', 'scheme', 'program', 'training', 'facility', 'athlete',
-                    'sport', 'fitness', 'talent', 'development', 'policy', 'guideline',
-                    'annual report', 'document', 'circular', 'notification', 'news',
-                    'achievement', 'infrastructure', 'centre', 'academy', 'course'
-                ]
-                
-                # Check if link contains priority keywords
-                is_priority = any(keyword in link_text or keyword in href.lower() for keyword in priority_keywords)
-                
-                links.append({
-                    'url': full_url,
-                    'text': link.get_text().strip()[:100],
-                    'priority': is_priority
-                })
-        
-        # Sort by priority and return unique URLs
-        links.sort(key=lambda x: x['priority'], reverse=True)
-        return list(set([link['url'] for link in links]))
+            if not hostname or not (hostname in _ALLOWED_DOMAINS or hostname.endswith(_ALLOWED_DOMAIN_SUFFIXES)):
+                continue
+            
+            # Check if link contains priority keywords
+            link_text = link.get_text().lower()
+            href_lower = href.lower()
+            if any(keyword in link_text or keyword in href_lower for keyword in self.LINK_PRIORITY_KEYWORDS):
+                priority_links.append(full_url)
+            else:
+                other_links.append(full_url)
+        
+        # Priority links first, then unique URLs in discovery order
+        return list(dict.fromkeys(priority_links + other_links))
+    
+    async def _fetch_page(self, url: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Download a page's raw HTML and declared charset, or None if the request fails"""
+        await asyncio.sleep(self.config.request_delay)
+        
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                self.logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
+                return None
+            # Raw bytes go straight to the parser, which decodes them in C; without
+            # a Content-Type charset, bs4 sniffs the page's meta declaration
+            return await response.read(), response.charset
+    
+    def _parse_page(self, url: str, html: bytes, encoding: Optional[str] = None) -> ScrapedContent:
+        soup = BeautifulSoup(html, HTML_PARSER, from_encoding=encoding)
+        
+        title = soup.title.string.strip() if soup.title else urlparse(url).path
+        # Links first: text extraction strips the nav/header/footer that hold most of them
+        hyperlinks = self._extract_hyperlinks(soup, url)
+        content = self._extract_text_content(soup)
+        metadata = self._extract_metadata(soup, url)
+        
+        # Same hex width as the old MD5 digests, at a fraction of the cost on large pages
+        content_hash = xxhash.xxh3_128_hexdigest(content.encode())
+        
+        return ScrapedContent(
+            url=url,
+            title=title,
+            content=content,
+            metadata=metadata,
+            scraped_at=datetime.now().isoformat(),
+            content_hash=content_hash,
+            hyperlinks=hyperlinks
+        )
+    
+    def _store_scraped(self, scraped_content: ScrapedContent):
+        self._save_to_cache(scraped_content)
+        self.scraped_urls.add(_url_fingerprint(scraped_content.url))
+        self.logger.info(f"Scraped: {scraped_content.url} (Content length: {len(scraped_content.content)})")
     
     async def _scrape_single_url(self, url: str) -> Optional[ScrapedContent]:
-        if url in self.scraped_urls:
+        if _url_fingerprint(url) in self.scraped_urls:
             return None
         
         cached_content = self._load_cached_content(url)
         if cached_content:
             self.logger.info(f"Using cached content for: {url}")
-            self.scraped_urls.add(url)
+            self.scraped_urls.add(_url_fingerprint(url))
             return cached_content
         
         try:
-            await asyncio.sleep(self.config.request_delay)
+            page = await self._fetch_page(url)
+            if page is None:
+                return None
             
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    self.logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
-                    return None
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                title = soup.title.string.strip() if soup.title else urlparse(url).path
-                content = self._extract_text_content(soup)
-                metadata = self._extract_metadata(soup, url)
-                
-                content_hash = hashlib.md5(content.encode()).hexdigest()
-                
-                scraped_content = ScrapedContent(
-                    url=url,
-                    title=title,
-                    content=content,
-                    metadata=metadata,
-                    scraped_at=datetime.now().isoformat(),
-                    content_hash=content_hash
-                )
-                
-                self._save_to_cache(scraped_content)
-                self.scraped_urls.add(url)
-                
-                self.logger.info(f"Scraped: {url} (Content length: {len(content)})")
-                return scraped_content
+            scraped_content = await asyncio.to_thread(self._parse_page, url, *page)
+            self._store_scraped(scraped_content)
+            return scraped_content
                 
         except Exception as e:
             self.logger.error(f"Error scraping {url}: {e}")
             return None
     
+    async def _fetch_hyperlinks(self, content: ScrapedContent) -> List[str]:
+        """Fetch links for a page cached without them, and store them in its cache entry"""
+        # Same request_delay and charset handling as any other page fetch
+        page = await self._fetch_page(content.url)
+        if page is None:
+            return []
+        html, charset = page
+        
+        soup = await asyncio.to_thread(BeautifulSoup, html, HTML_PARSER, from_encoding=charset)
+        content.hyperlinks = self._extract_hyperlinks(soup, content.url)
+        self._save_to_cache(content)
+        return content.hyperlinks
+    
     async def _scrape_with_hyperlinks(self, start_urls: List[str], max_depth: int = 3) -> List[ScrapedContent]:
-        """Enhanced deep scraping with better hyperlink following"""
+        """Enhanced deep scraping with better hyperlink following
+        
+        Fetch workers download pages while parse workers turn earlier
+        downloads into content and queue their links, so network waits overlap
+        HTML processing instead of alternating with it in depth-wide waves.
+        """
         all_content = []
-        urls_to_process = [(url, 0) for url in start_urls]
+        urls_by_depth = {depth: 0 for depth in range(max_depth + 1)}
+        # Shallow URLs first, so pages keep roughly the depth a breadth-first crawl gives them
+        url_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
         processed_urls = set()
-        urls_by_depth = {0: [], 1: [], 2: [], 3: []}
         
-        self.logger.info(f"Starting deep scan with max depth: {max_depth}")
+        def enqueue(url: str, depth: int):
+            fingerprint = _url_fingerprint(url)
+            if fingerprint not in processed_urls and depth <= max_depth:
+                processed_urls.add(fingerprint)
+                url_queue.put_nowait((depth, url))
         
-        while urls_to_process:
-            # Process URLs in batches by depth (breadth-first approach)
-            current_depth = min(depth for _, depth in urls_to_process)
-            current_batch = [(url, depth) for url, depth in urls_to_process if depth == current_depth][:15]
-            
-            # Remove processed batch from queue
-            urls_to_process = [(url, depth) for url, depth in urls_to_process if depth != current_depth or (url, depth) not in current_batch]
+        async def follow_links(content: ScrapedContent, depth: int):
+            all_content.append(content)
+            urls_by_depth[depth] += 1
             
-            self.logger.info(f"Processing {len(current_batch)} URLs at depth {current_depth}")
-            
-            # Scrape current batch
-            tasks = []
-            for url, depth in current_batch:
-                if url not in processed_urls and depth <= max_depth:
-                    tasks.append(self._scrape_single_url(url))
-                    processed_urls.add(url)
-            
-            if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Process results and extract new links
-                for result, (url, depth) in zip(results, current_batch):
-                    if isinstance(result, ScrapedContent):
-                        all_content.append(result)
-                        urls_by_depth[depth].append(url)
-                        
-                        # Extract hyperlinks for next depth level
-                        if depth < max_depth:
-                            try:
-                                async with self.session.get(url) as response:
-                                    if response.status == 200:
-                                        html = await response.text()
-                                        soup = BeautifulSoup(html, 'html.parser')
-                                        hyperlinks = self._extract_hyperlinks(soup, url)
-                                        
-                                        # Limit new links per page based on depth
-                                        max_links = max(15 - depth * 3, 5)
-                                        for link in hyperlinks[:max_links]:
-                                            if link not in processed_urls:
-                                                urls_to_process.append((link, depth + 1))
-                                        
-                                        self.logger.info(f"Found {len(hyperlinks[:max_links])} new links from {url}")
-                                        
-                            except Exception as e:
-                                self.logger.warning(f"Failed to extract hyperlinks from {url}: {e}")
+            # Extract hyperlinks for next depth level
+            if depth < max_depth:
+                try:
+                    hyperlinks = content.hyperlinks
+                    if hyperlinks is None:
+                        hyperlinks = await self._fetch_hyperlinks(content)
+                    
+                    # Limit new links per page based on depth
+                    max_links = max(15 - depth * 3, 5)
+                    for link in hyperlinks[:max_links]:
+                        enqueue(link, depth + 1)
+                    
+                    self.logger.info(f"Found {len(hyperlinks[:max_links])} new links from {content.url}")
+                    
+                except Exception as e:
+                    self.logger.warning(f"Failed to extract hyperlinks from {content.url}: {e}")
+        
+        async def fetcher():
+            while True:
+                depth, url = await url_queue.get()
+                handed_off = False
+                try:
+                    if _url_fingerprint(url) in self.scraped_urls:
+                        continue
+                    
+                    cached_content = self._load_cached_content(url)
+                    if cached_content:
+                        self.logger.info(f"Using cached content for: {url}")
+                        self.scraped_urls.add(_url_fingerprint(url))
+                        await follow_links(cached_content, depth)
+                        continue
+                    
+                    page = await self._fetch_page(url)
+                    if page is not None:
+                        # The parser marks the URL done once its links are queued
+                        await parse_queue.put((url, depth, page))
+                        handed_off = True
+                except Exception as e:
+                    self.logger.error(f"Error scraping {url}: {e}")
+                finally:
+                    if not handed_off:
+                        url_queue.task_done()
+        
+        async def parser():
+            while True:
+                url, depth, page = await parse_queue.get()
+                try:
+                    # Parsing is CPU work; keep the event loop free for the fetchers
+                    scraped_content = await asyncio.to_thread(self._parse_page, url, *page)
+                    self._store_scraped(scraped_content)
+                    await follow_links(scraped_content, depth)
+                except Exception as e:
+                    self.logger.error(f"Error scraping {url}: {e}")
+                finally:
+                    url_queue.task_done()
+        
+        self.logger.info(f"Starting deep scan with max depth: {max_depth}")
+        
+        for url in start_urls:
+            enqueue(url, 0)
+        
+        workers = [asyncio.create_task(fetcher()) for _ in range(CRAWL_FETCH_WORKERS)]
+        workers += [asyncio.create_task(parser()) for _ in range(CRAWL_PARSE_WORKERS)]
+        try:
+            await url_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._flush_cache()
         
         # Log scanning summary
-        total_by_depth = {depth: len(urls) for depth, urls in urls_by_depth.items() if urls}
+        total_by_depth = {depth: count for depth, count in urls_by_depth.items() if count}
         self.logger.info(f"Deep scan complete. URLs by depth: {total_by_depth}")
         
         return all_content
@@ -366,8 +492,8 @@ class WebScraper:
             else:
                 self.logger.debug(f"Filtered out low relevance content: {content.title} (score: {relevance_score})")
         
-        # Sort by relevance score (highest first)
-        documents.sort(key=lambda x: x['metadata']['relevance_score'], reverse=True)
+        # Sort by relevance score (highest first); URL breaks ties, since crawl order varies
+        documents.sort(key=lambda x: (-x['metadata']['relevance_score'], x['source']))
         
         self.logger.info(f"Filtered {len(documents)} relevant documents from {len(scraped_contents)} scraped pages")
         return documents